@@ -1,7 +1,24 @@
-import emoji
-import inflect
 import random
 import argparse
+import time
+import json
+import os
+import functools
+import math
+import struct
+import shutil
+import sys
+import atexit
+from array import array
+from collections import OrderedDict
+
+# Heavier libraries are only imported when first needed, so processes that never render or batch start up quickly:
+# emoji and inflect are imported by draw_glyph and draw_header, numpy by BatchBoard, and concurrent.futures by simulate
+np = None
+
+# Counters and timers of the hot paths, see stats; None while instrumentation is off, so each probe costs a single comparison
+# Setting the CONNECK_STATS environment variable turns them on at import, and --stats or CONNECK_STATS dumps them at exit
+STATS = {} if os.environ.get("CONNECK_STATS") else None
 
 # Class represents an m row x n column game board grid for two players with randomly assigned chip colors at start
 # Limit size represents the number of chips chained together in a single row, column, or diagnoal to form a win
@@ -12,6 +29,10 @@ import argparse
 
 class GameBoard:
 
+    # Game boards only hold the attributes below, without a per-instance dict, as many of them may be kept in memory at once
+    __slots__ = ("_backend", "_debug", "_moves", "_rows", "_cols", "_limit", "_board", "_masks", "_heights", "_zobrist",
+                 "_row_cache", "_dirty", "_cell_lines", "_line_counts", "_chains", "_threats", "_open")
+
     # Shuffle from valid emoji circle colors and pop two entries to assign to the two players
     random.shuffle(PLAYER_COLORS := ["red", "orange", "yellow", "green", "blue", "purple", "brown"])
     PLAYER_A = (1, PLAYER_COLORS.pop())
@@ -30,23 +51,47 @@ class GameBoard:
     # Define game board default limit size
     DEFAULT_LIMIT = 4
 
+    # Define game board storage backends; "grid" stores a dict of lists, "bitboard" stores one integer mask per player
+    BACKENDS = ("grid", "bitboard")
+    DEFAULT_BACKEND = "grid"
+
+    # Define whether game boards check the moves of make_move and unmake_move by default
+    DEBUG = False
+
+    # Define one random 64-bit Zobrist key per player and grid coordinate, up to the maximum game board size
+    # Keys are drawn from a fixed seed so that position hashes agree across processes and runs
+    ZOBRIST = list(map(random.Random(0xC044EC4).getrandbits, [64] * (2 * (MAX_COLS+1) * (MAX_ROWS+1))))
+
     # Initialize game board with user-defined row, column, and limit sizes, or use default
     # As it is easier to operate the game board using cartesian coordinates, row indexes are created in reverse
     # (e.g., row 6 is the top-most row, and row 1 is the bottom-most row, with columns 1 thru 7 going left to right)
     def __init__(self, **kwargs):
 
-        # Board is constructed as a dict of lists, with rows as dict keys, and lists sized to game board columns
-        self.board = {}
+        # Board storage backend is selected first, as it decides how the grid is held in memory
+        self.backend = kwargs.get("backend", GameBoard.DEFAULT_BACKEND)
+
+        # Debug game boards check every move played by make_move and unmake_move, which are otherwise trusted
+        self._debug = bool(kwargs.get("debug", GameBoard.DEBUG))
 
-        # Moves history is constructed as a linear list
+        # Moves history is constructed as a linear array of two bytes per move, see MoveLog
         self.moves = []
 
         # Do the assignment of rows, columns, and limit, using defaults if no arguments provided
         self.rows = kwargs.get("rows", GameBoard.DEFAULT_ROWS)
         self.cols = kwargs.get("cols", GameBoard.DEFAULT_COLS)
         self.limit = kwargs.get("limit", GameBoard.DEFAULT_LIMIT)
-        for i in reversed(range(0, self.rows)):
-            self.board[i+1] = [ None for _ in range(self.cols) ]
+
+        # Board is constructed as a dict of lists, with rows as dict keys, and lists sized to game board columns
+        # The bitboard backend keeps one mask per player instead, see the board property
+        # Both backends keep a column-height vector alongside, so finding the next open row never scans the column
+        self.board = { i+1: [ None for _ in range(self.cols) ] for i in reversed(range(0, self.rows)) }
+
+    # Function returns a new game board with the same sizes, backend, and history of moves
+    def copy(self):
+        gb = GameBoard(rows = self._rows, cols = self._cols, limit = self._limit, backend = self._backend, debug = self._debug)
+        for move in self.moves:
+            gb.set_player(move["c"], move["r"], move["player"])
+        return gb
 
     # Generate the output string to render the game header, grid header, and game board grid
     # Function utlizes the emoji library to generate empty space (white circles) and player moves (colored circles)
@@ -54,22 +99,30 @@ class GameBoard:
         # Clear the screen
         print(end="\033c", flush=True)
 
-        # Render the game header to output string
-        s = f"-- Connect {self._limit} --\n\n"
+        # Return the output string
+        return self.render()
 
-        # Render the grid header to output string
-        for i in range(1, self._cols + 1):
-            s += emoji.emojize(f":{inflect.engine().number_to_words(i)}:", language='alias') + " "
-        s += f"\n{emoji.emojize(":red_triangle_pointed_down:", language='alias') * self._cols}\n"
+    # Function returns the output string of the game header, grid header, and game board grid, without clearing the screen
+    # Each row of the grid is cached as a string, and only rows touched by a move since the last render are drawn again
+    def render(self):
+        if STATS is not None:
+            start = time.perf_counter()
+            count_stat("render.rows", (self._dirty >> 1 & ((1 << self._rows) - 1)).bit_count() if self._row_cache is not None else self._rows)
+        # Render the game header and grid header, which only depend on the limit and column sizes
+        s = [f"-- Connect {self._limit} --\n\n", draw_header(self._cols)]
 
-        # Render the grid to output string
-        for r, c in self._board.items():
-            for i in c:
-                s += self.__draw_cell(i)
-            s += "\n"
+        # Render the grid, top-most row first, redrawing the rows that changed
+        if self._row_cache is None: self._row_cache = [""] * (self._rows + 1)
+        for r in range(1, self._rows + 1):
+            if self._dirty >> r & 1: self._row_cache[r] = "".join([ self.__draw_cell(self.get_player(c, r)) for c in range(1, self._cols + 1) ]) + "\n"
+        self._dirty = 0
+        s.extend(self._row_cache[r] for r in reversed(range(1, self._rows + 1)))
+        if STATS is not None:
+            count_stat("render.calls")
+            count_stat("render.seconds", time.perf_counter() - start)
 
         # Return the output string
-        return s
+        return "".join(s)
 
     # Define the rows property for the game board
     @property
@@ -102,23 +155,84 @@ class GameBoard:
         if not self.is_valid_location(limit, limit): limit = max(self._rows, self._cols)
         self._limit = limit
 
+        # Changing the limit size of a game board in play changes its winning lines, so their counts are rebuilt
+        if hasattr(self, "_line_counts"): self.board = self.board
+
+    # Define the backend property for the game board
+    @property
+    def backend(self):
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        if backend not in GameBoard.BACKENDS: backend = GameBoard.DEFAULT_BACKEND
+        self._backend = backend
+
     # Define the board property for the game board
+    # The bitboard backend has no dict of lists, so one is built on demand from the player masks
     @property
     def board(self):
+        if self._backend == "bitboard":
+            return { r: [ self.get_player(c, r) for c in range(1, self._cols + 1) ] for r in reversed(range(1, self._rows + 1)) }
         return self._board
 
     @board.setter
     def board(self, board):
-        self._board = board
+        # Rendered rows are cached as strings once rendered, and rows needing a redraw are kept as bits of a mask
+        self._row_cache = None
+        self._dirty = (1 << (self._rows + 1)) - 2
+        self._heights = array("B", bytes(self._cols))
+        self._zobrist = 0
+        for r, row in board.items():
+            for c, p in enumerate(row, start=1):
+                if self.is_valid_player(p): self._zobrist ^= self.get_key(c, r, p)
+        if self._backend == "bitboard":
+            # Bits are laid out column by column, bottom row first, with one spare (always empty) bit on top of every column
+            # The spare bit stops shifted chains from wrapping from the top of one column into the bottom of the next
+            self._masks = [0, 0]
+            for r, row in board.items():
+                for c, p in enumerate(row, start=1):
+                    if self.is_valid_player(p): self.__set_bit(c, r, p)
+        else:
+            self._board = board
+        for c in range(1, self._cols + 1):
+            self.__raise_height(c)
+
+        # Every possible winning line keeps a count of each player's chips on it, see get_lines
+        # A line completed by a player is a chain, and a line one chip short of a chain with no opposing chip is a threat
+        # A line with no opposing chip is still open to a player, and the game is a draw once no line is open to either player
+        self._cell_lines = get_lines(self._rows, self._cols, self._limit)[1]
+        self._line_counts = [ array("B", bytes(len(get_lines(self._rows, self._cols, self._limit)[0]))) for _ in range(2) ]
+        self._chains = [0, 0]
+        self._threats = [0, 0]
+        self._open = [len(get_lines(self._rows, self._cols, self._limit)[0])] * 2
+        for r, row in board.items():
+            for c, p in enumerate(row, start=1):
+                if self.is_valid_player(p): self.__count_line_chips(c, r, p, 1)
+
+    # Define the Zobrist hash property for the game board, i.e., the XOR of the keys of every occupied grid coordinate
+    @property
+    def zobrist(self):
+        return self._zobrist
+
+    # Define the player masks property for the game board; only the bitboard backend keeps masks
+    @property
+    def masks(self):
+        return tuple(self._masks) if self._backend == "bitboard" else None
+
+    # Define the heights property for the game board
+    @property
+    def heights(self):
+        return tuple(self._heights)
 
-    # Define the moves property for the game board
+    # Define the moves property for the game board, i.e., a read-only view of the history of moves
     @property
     def moves(self):
-        return self._moves
+        return MoveLog(self, self._moves)
 
     @moves.setter
     def moves(self, moves):
-        self._moves = moves
+        self._moves = array("H", [ (move["c"]-1) * self._rows + move["r"]-1 | move["player"][0] << 8 for move in moves ])
 
     # Function checks the validity of a grid coordinate given its row and column position
     def is_valid_location(self, c, r):
@@ -130,14 +244,162 @@ class GameBoard:
 
     # Function gets the state of a grid coordinate given its row and column position
     def get_player(self, c, r):
-        if self.is_valid_location(c, r): return self._board[r][c-1]
+        if self.is_valid_location(c, r):
+            if self._backend == "bitboard":
+                bit = self.get_bit(c, r)
+                if self._masks[0] & bit: return GameBoard.PLAYER_A
+                if self._masks[1] & bit: return GameBoard.PLAYER_B
+                return None
+            return self._board[r][c-1]
 
     # Function sets the state of a grid coordinate given its row and column position
     # If the coordinate is valid (i.e., open and not played), assign the state and add the move to the history
     def set_player(self, c, r, p):
         if self.is_valid_location(c, r) and self.is_valid_player(p):
+            if self.is_valid_player(q := self.get_player(c, r)): self.__clear(c, r, q)
+            self.__place(c, r, p)
+            self.__raise_height(c)
+            self._moves.append((c-1) * self._rows + r-1 | p[0] << 8)
+
+    # Function takes back the last move played from the history, clearing its grid coordinate, and returns the move
+    def pop_move(self):
+        if len(self._moves) == 0: return None
+        move = self.moves[-1]
+        c, r = move["c"], move["r"]
+        self._moves.pop()
+        if self.is_valid_player(q := self.get_player(c, r)): self.__clear(c, r, q)
+        self._heights[c-1] = min(self._heights[c-1], r-1)
+        return move
+
+    # Function drops a chip for the player whose turn it is in a column, without any of the checks done by drop_chip
+    # This is the trusted fast path for game tree searches, which only ever play legal columns: nothing is validated, and no
+    # move dict is built, unless the game board was created with debug = True, in which case an illegal column raises ValueError
+    def make_move(self, c):
+        if self._debug and (not 1 <= c <= self._cols or self._heights[c-1] >= self._rows): raise ValueError(f"illegal column {c}")
+        r = self._heights[c-1] + 1
+        p = GameBoard.PLAYER_A if len(self._moves) % 2 == 0 else GameBoard.PLAYER_B
+        self.__place(c, r, p)
+        self._heights[c-1] = r
+        self._moves.append((c-1) * self._rows + r-1 | p[0] << 8)
+
+    # Function takes back the last move played by make_move, without any of the checks done by pop_move, or returning the move
+    # Unless the game board was created with debug = True, in which case taking back a chip not on top of its column raises ValueError
+    def unmake_move(self):
+        if self._debug and (len(self._moves) == 0 or (self._moves[-1] & 0xFF) % self._rows + 1 != self._heights[(self._moves[-1] & 0xFF) // self._rows]): raise ValueError("no move to take back")
+        move = self._moves.pop()
+        c, r = (move & 0xFF) // self._rows + 1, (move & 0xFF) % self._rows + 1
+        self.__clear(c, r, GameBoard.PLAYER_A if move >> 8 == GameBoard.PLAYER_A[0] else GameBoard.PLAYER_B)
+        self._heights[c-1] = r - 1
+
+    # Function puts a player's chip at a grid coordinate, updating the hash, line counts, and rendered rows, but not the history
+    def __place(self, c, r, p):
+        self._zobrist ^= self.get_key(c, r, p)
+        self.__count_line_chips(c, r, p, 1)
+        if self._backend == "bitboard":
+            self.__set_bit(c, r, p)
+        else:
             self._board[r][c-1] = p
-            self._moves.append({"c": c, "r": r, "player": p})
+        self._dirty |= 1 << r
+
+    # Function takes a player's chip off a grid coordinate, updating the hash, line counts, and rendered rows, but not the history
+    def __clear(self, c, r, p):
+        self._zobrist ^= self.get_key(c, r, p)
+        self.__count_line_chips(c, r, p, -1)
+        if self._backend == "bitboard":
+            self._masks[p[0]-1] &= ~self.get_bit(c, r)
+        else:
+            self._board[r][c-1] = None
+        self._dirty |= 1 << r
+
+    # Function returns the Zobrist key of a player at a grid coordinate
+    def get_key(self, c, r, p):
+        return GameBoard.ZOBRIST[((p[0]-1) * (GameBoard.MAX_COLS+1) + c) * (GameBoard.MAX_ROWS+1) + r]
+
+    # Function returns the number of winning lines completed by a player, i.e., a player has won when this is not 0
+    def count_chains(self, p):
+        if self.is_valid_player(p): return self._chains[p[0]-1]
+
+    # Function returns the number of winning lines a player is one chip short of completing, with no opposing chip on them
+    def count_threats(self, p):
+        if self.is_valid_player(p): return self._threats[p[0]-1]
+
+    # Function returns the number of winning lines a player could still complete, i.e., with no opposing chip on them
+    def count_open_lines(self, p):
+        if self.is_valid_player(p): return self._open[p[0]-1]
+
+    # Function checks whether the game is a draw, i.e., every winning line holds chips of both players, so neither can win anymore
+    # This is known as soon as the last open line is blocked, often long before the game board is full on large boards with high limits
+    def is_draw(self):
+        return self._open[0] == 0 and self._open[1] == 0
+
+    # Function adds (n = 1) or removes (n = -1) a player's chip at a grid coordinate to the counts of every line through it
+    # A line is a chain or a threat for a player depending on both players' counts, so both players' tallies may change
+    def __count_line_chips(self, c, r, p, n):
+        k, i = self._limit, p[0]-1
+        mine, theirs = self._line_counts[i], self._line_counts[1-i]
+        for line in self._cell_lines[(c-1) * self._rows + r-1]:
+            a, b = mine[line], theirs[line]
+            mine[line] = a + n
+            if (a == 0) != (a + n == 0): self._open[1-i] += 1 if a + n == 0 else -1
+            if b == 0:
+                self._threats[i] += (a + n == k - 1) - (a == k - 1)
+                self._chains[i] += (a + n == k) - (a == k)
+            if b >= k - 1 and (a == 0) != (a + n == 0):
+                if b == k - 1: self._threats[1-i] += 1 if a + n == 0 else -1
+                else: self._chains[1-i] += 1 if a + n == 0 else -1
+
+    # Function returns the number of chips stacked without gaps from the bottom row of a column
+    # The next chip dropped in the column lands in the row just above, i.e., column height + 1
+    def column_height(self, c):
+        if 1 <= c <= self._cols: return self._heights[c-1]
+
+    # Function checks whether a column has no open row left to drop a chip in
+    def is_column_full(self, c):
+        return self.column_height(c) == self._rows
+
+    # Function returns the columns that still have an open row to drop a chip in, going left to right
+    def legal_columns(self):
+        return [ c for c in range(1, self._cols + 1) if self._heights[c-1] < self._rows ]
+
+    # Function returns the single-bit mask of a grid coordinate for the bitboard backend
+    def get_bit(self, c, r):
+        return 1 << ((c-1) * (self._rows+1) + r-1)
+
+    # Function returns the mask of all the grid coordinates occupied by a player for the bitboard backend
+    def get_mask(self, p):
+        if self._backend == "bitboard" and self.is_valid_player(p): return self._masks[p[0]-1]
+
+    # Function sets a player's bit for the bitboard backend, clearing the other player's bit
+    def __set_bit(self, c, r, p):
+        bit = self.get_bit(c, r)
+        self._masks[0] &= ~bit
+        self._masks[1] &= ~bit
+        self._masks[p[0]-1] |= bit
+
+    # Function raises the height of a column past every chip now stacked without gaps from the bottom row
+    def __raise_height(self, c):
+        while self._heights[c-1] < self._rows and self.is_valid_player(self.get_player(c, self._heights[c-1]+1)):
+            self._heights[c-1] += 1
+
+    # Function returns the state of every grid coordinate as a string, rows from top to bottom separated by "/"
+    # Each cell is the number of the player occupying it, or "." if not yet in play, e.g., ".../.2./.11" on a 3 x 3 game board
+    def get_position(self):
+        return "/".join([ "".join([ str(p[0]) if self.is_valid_player(p := self.get_player(c, r)) else "." for c in range(1, self._cols + 1) ]) for r in reversed(range(1, self._rows + 1)) ])
+
+    # Function returns a key identifying the position on the game board, and whether it is the mirrored position's key
+    # A game board mirrored across its columns has the same value, so both share the smaller of their two keys
+    def get_canonical_key(self):
+        position = self.get_position()
+        mirrored = "/".join(row[::-1] for row in position.split("/"))
+        prefix = f"{self._rows}x{self._cols}x{self._limit}:"
+        return (prefix + mirrored, True) if mirrored < position else (prefix + position, False)
+
+    # Function returns a 64-bit hash of the canonical key of the position on the game board, and whether it is the mirrored position's
+    # Unlike the Zobrist hash, it also tells game boards of different sizes and limits apart, and is the same for mirror images
+    def get_canonical_hash(self):
+        import hashlib
+        key, mirrored = self.get_canonical_key()
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big"), mirrored
 
     # Function returns the next player given the history of moves
     def next_turn(self):
@@ -145,15 +407,31 @@ class GameBoard:
 
     # Function returns the last move played from the history
     def get_lastmove(self):
-        return self._moves[-1] if len(self._moves) >= 1 else None
+        return self.moves[-1] if len(self._moves) >= 1 else None
 
     # Function returns the output string of a player
     def draw_player(self, p):
-        if self.is_valid_player(p): return emoji.emojize(f":{p[1]}_circle:", language='alias')
+        if self.is_valid_player(p): return draw_glyph(f":{p[1]}_circle:")
 
     # Function returns the output string of a cell (default) or a player
     def __draw_cell(self, p):
-        return self.draw_player(p) if self.is_valid_player(p) else emoji.emojize(":white_circle:", language='alias')
+        return self.draw_player(p) if self.is_valid_player(p) else draw_glyph(":white_circle:")
+
+# Function returns the output string of an emoji alias, e.g., ":red_circle:"
+# Emojizing is slow next to the rest of a redraw, so each alias is only emojized once and cached
+@functools.cache
+def draw_glyph(alias: str):
+    import emoji
+    return emoji.emojize(alias, language='alias')
+
+# Function returns the output string of the grid header, i.e., the column numbers above a row of arrows pointing down
+# The grid header only depends on the number of columns, so it is rendered once per column size and cached
+@functools.cache
+def draw_header(cols: int):
+    import inflect
+    words = inflect.engine()
+    numbers = "".join([ draw_glyph(f":{words.number_to_words(i)}:") + " " for i in range(1, cols + 1) ])
+    return f"{numbers}\n{draw_glyph(':red_triangle_pointed_down:') * cols}\n"
 
 # Function returns the "chains" of adjacent chips to inspect to inspect for a win, given a starting coordinate
 # Function emulates how a real person would play Connect-4 e.g. do I have a row, column, or diagonal of chips to inspect
@@ -171,15 +449,114 @@ def get_chains(gb: GameBoard, c: int, r: int):
     if gb.cols - c + 1 >= gb.limit and r >= gb.limit: chains["SE"] = [(1,-1), set()]
     return chains
 
+# Function returns whether a bitboard mask holds a chain of limit bits along any row, column, or diagonal
+# Each direction is a fixed shift between neighboring bits: 1 for columns, rows + 1 for rows, and rows + 1 +/- 1 for diagonals
+# A chain of n bits ANDed with itself shifted by up to n more steps yields a chain of up to 2n, so only a few shifts are needed
+def find_chain_bits(gb: GameBoard, mask: int):
+    for shift in (1, gb.rows + 1, gb.rows + 2, gb.rows):
+        m, n = mask, 1
+        while n < gb.limit and m:
+            step = min(n, gb.limit - n)
+            m &= m >> (step * shift)
+            n += step
+        if m: return True
+    return False
+
+# Class represents a read-only view of the history of moves of a game board, which is stored as two bytes per move
+# Every move is stored as its grid coordinate index (c-1) * rows + (r-1), which fits the low byte up to the maximum game board size,
+# with the player number who played it in the high byte, and is only expanded to a {"c": c, "r": r, "player": p} dict when read
+class MoveLog:
+
+    __slots__ = ("_gb", "_log")
+
+    # Initialize the view over a game board and its array of moves
+    def __init__(self, gb: GameBoard, log: array):
+        self._gb = gb
+        self._log = log
+
+    # Function returns the number of moves played
+    def __len__(self):
+        return len(self._log)
+
+    # Function returns the move at an index, or a list of the moves in a slice
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [ self.__move(move) for move in self._log[i] ]
+        return self.__move(self._log[i])
+
+    # Function iterates over the moves in the order they were played
+    def __iter__(self):
+        return map(self.__move, self._log)
+
+    # Function compares the moves with another sequence of moves, e.g., a list of dicts
+    def __eq__(self, other):
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    # Function returns the output string of the moves, i.e., the list of their dicts
+    def __repr__(self):
+        return repr(list(self))
+
+    # Function expands a stored move to its move dict
+    def __move(self, move):
+        cell = move & 0xFF
+        return {"c": cell // self._gb.rows + 1, "r": cell % self._gb.rows + 1, "player": GameBoard.PLAYER_A if move >> 8 == GameBoard.PLAYER_A[0] else GameBoard.PLAYER_B}
+
+# Function returns every possible winning line of a game board size and limit, and the lines passing through each grid coordinate
+# Lines are tuples of (column, row) coordinates, and a grid coordinate's lines are found at index (c-1) * rows + (r-1)
+# The lines of a game board size and limit never change, so they are computed once and cached
+@functools.cache
+def get_lines(rows: int, cols: int, limit: int):
+    lines = []
+    for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+        if limit == 1 and (dc, dr) != (1, 0): break
+        for c in range(1, cols + 1):
+            for r in range(1, rows + 1):
+                if 1 <= c + (limit-1)*dc <= cols and 1 <= r + (limit-1)*dr <= rows:
+                    lines.append(tuple((c + i*dc, r + i*dr) for i in range(limit)))
+    cell_lines = [ [] for _ in range(rows * cols) ]
+    for i, line in enumerate(lines):
+        for c, r in line:
+            cell_lines[(c-1) * rows + r-1].append(i)
+    return tuple(lines), tuple(map(tuple, cell_lines))
+
+# Function returns the number of chips of the same player chained to a grid coordinate in one direction, up to the limit size
+# The chip at the grid coordinate itself is not counted, so a chain of limit chips is the sum of both directions plus one
+def count_chain(gb: GameBoard, c: int, r: int, dc: int, dr: int):
+    p = gb.get_player(c, r)
+    n = 0
+    if gb.is_valid_player(p):
+        while n < gb.limit - 1 and gb.get_player(c + (n+1)*dc, r + (n+1)*dr) == p: n += 1
+    return n
+
 # Function returns the winning player on the game board, or None if none could be found
 # Function emulates how a real person would play Connect-4 e.g., do I have a winning row, column, or diagonal given my moves
 # Function only targets the player's current and previous moves, ignoring the other player, and ignores cells not yet in play
-def find_winner(gb: GameBoard):
+# Optional mode argument selects how the board is inspected, all modes returning the same result:
+# 1. "scan" walks every move made by the last player, as described above (default on the grid backend)
+# 2. "lastmove" only counts outward from the last move along the four axes, as a win can only pass through the latest chip
+# 3. "bits" answers the same question with a few shifts and ANDs on the last player's mask (default on the bitboard backend)
+# 4. "lines" looks up the count of winning lines completed by the last player, which the game board keeps up to date
+def find_winner(gb: GameBoard, **kwargs):
+    mode = kwargs.get("mode", "bits" if gb.backend == "bitboard" else "scan")
+    if STATS is not None: count_stat("find_winner.calls")
+    if mode == "lastmove":
+        move = gb.get_lastmove()
+        for dc, dr in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            n = 1 + count_chain(gb, move["c"], move["r"], dc, dr) + count_chain(gb, move["c"], move["r"], -dc, -dr)
+            if STATS is not None: count_stat("find_winner.cells", n)
+            if n >= gb.limit: return move["player"]
+        return None
+    if mode == "bits" and gb.backend == "bitboard":
+        p = gb.get_lastmove()["player"]
+        return p if find_chain_bits(gb, gb.get_mask(p)) else None
+    if mode == "lines":
+        p = gb.get_lastmove()["player"]
+        return p if gb.count_chains(p) else None
     found = False
     for move in gb.moves[gb.get_lastmove()["player"][0]-1::2]:
         chains = get_chains(gb, move["c"], move["r"])
         for i in range(0, gb.limit):
             p = None
+            if STATS is not None: count_stat("find_winner.cells", len(chains))
             for direction in list(chains.keys()):
                 p = gb.get_player(move["c"]+i*chains[direction][0][0], move["r"]+i*chains[direction][0][1])
                 if gb.is_valid_player(p):
@@ -195,17 +572,1540 @@ def find_winner(gb: GameBoard):
 
 # Function returns a bool based on whether or not a play (i.e., dropping a chip in a valid column) has been successful
 # Function emulates how a real person would play Connect-4 e.g., I can drop a chip in a column where there's still space
+# The game board tracks the height of every column, so the open row is known without scanning the column
 def drop_chip(gb: GameBoard, c: int, **kwargs):
     p = kwargs.get("p", gb.next_turn())
-    if not gb.is_valid_location(c, 1) or not gb.is_valid_player(p): return False
-    for r in range(1, gb.rows+1):
-        if not gb.is_valid_player(gb.get_player(c, r)):
-            gb.set_player(c, r, p)
-            break
-        elif r == gb.rows and gb.is_valid_player(gb.get_player(c, r)):
-            return False
+    if STATS is not None: count_stat("drop_chip.calls")
+    if not gb.is_valid_location(c, 1) or not gb.is_valid_player(p) or gb.is_column_full(c):
+        if STATS is not None: count_stat("drop_chip.rejected")
+        return False
+    gb.set_player(c, gb.column_height(c) + 1, p)
     return True
 
+# Class represents a negamax game tree search with alpha-beta pruning for the player whose turn it is on a game board
+# Scores are from the point of view of that player: positive for a forced win, negative for a forced loss, and otherwise a small
+# heuristic score, see evaluate
+# A forced result is scored as MATE less the number of plies to the winning chip, so quicker wins score higher
+# The search deepens iteratively, one ply at a time, until the position is solved or the time or node budget runs out
+# Positions already searched are kept in a bounded transposition table keyed by the Zobrist hash of the game board
+class Solver:
+
+    # Define the score of a win on the next ply, and the default transposition table size (in entries)
+    MATE = 10000
+    DEFAULT_TABLE_SIZE = 1 << 20
+
+    # Define transposition table entry flags, i.e., whether the stored score is exact, a lower bound, or an upper bound
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    # Initialize the solver with an optional transposition table size, which is kept across searches, and a PositionCache
+    # Zobrist hashes do not tell game boards of different sizes and limits apart, so the table is only kept across searches of
+    # game boards of the same size and limit, i.e., the size of the last game board searched
+    def __init__(self, **kwargs):
+        self.table_size = max(1, kwargs.get("table_size") or Solver.DEFAULT_TABLE_SIZE)
+        self.cache = kwargs.get("cache")
+        self.table = {}
+        self.size = None
+        self.nodes = 0
+        self.cutoffs = 0
+        self.probes = 0
+        self.hits = 0
+        self.deadline = None
+        self.max_nodes = None
+        self.stop = None
+
+    # Function searches the game board for the best column to play, and returns it along with its score and distance
+    # Distance is the number of plies to the chip that ends the game with a forced win or loss, or None if not forced
+    # Optional time (in seconds) and nodes arguments limit the search, in which case the deepest completed search is returned,
+    # as does setting the optional stop event (e.g., a threading.Event) from another thread
+    # Solved positions are looked up in, and added to, the solver's PositionCache if it has one
+    def solve(self, gb: GameBoard, **kwargs):
+        if self.cache is not None and (cached := self.cache.get(gb)) is not None:
+            if STATS is not None: count_stat("solver.cache_hits")
+            return {**cached, "depth": 0, "nodes": 0, "solved": True}
+        gb = gb.copy()
+        if self.size != (gb.rows, gb.cols, gb.limit): self.table, self.size = {}, (gb.rows, gb.cols, gb.limit)
+        self.nodes = self.cutoffs = self.probes = self.hits = 0
+        self.deadline = time.perf_counter() + kwargs["time"] if kwargs.get("time") is not None else None
+        self.max_nodes = kwargs.get("nodes")
+        self.stop = kwargs.get("stop")
+        order = sorted(gb.legal_columns(), key=lambda c: abs(2 * c - gb.cols - 1))
+        result = {"c": order[0] if order else None, "score": 0, "distance": None, "depth": 0, "nodes": 0, "solved": not order}
+        remaining = gb.rows * gb.cols - len(gb.moves)
+        if gb.is_draw(): remaining = min(remaining, 1)
+        for depth in range(1, remaining + 1):
+            try:
+                score, c = self.__search(gb, depth, -Solver.MATE, Solver.MATE, 0)
+            except TimeoutError:
+                break
+            solved = abs(score) > Solver.MATE - remaining - 1 or depth == remaining
+            distance = Solver.MATE - abs(score) if abs(score) > Solver.MATE - remaining - 1 else None
+            result = {"c": c, "score": score, "distance": distance, "depth": depth, "nodes": self.nodes, "solved": solved}
+            if solved: break
+        result["nodes"] = self.nodes
+        if STATS is not None:
+            for name, n in (("searches", 1), ("nodes", self.nodes), ("cutoffs", self.cutoffs), ("tt_probes", self.probes), ("tt_hits", self.hits)):
+                count_stat("solver." + name, n)
+        if self.cache is not None and result["solved"] and result["c"] is not None: self.cache.put(gb, result)
+        return result
+
+    # Function returns the heuristic score of a game board that is not searched any deeper, for the player whose turn it is
+    # The score is the difference in open threats between the two players, which stays well below any forced result
+    def evaluate(self, gb: GameBoard):
+        if len(gb.moves) + 1 >= gb.rows * gb.cols: return 0
+        p = gb.next_turn()
+        q = GameBoard.PLAYER_B if p == GameBoard.PLAYER_A else GameBoard.PLAYER_A
+        return gb.count_threats(p) - gb.count_threats(q)
+
+    # Function returns the negamax score of the game board and its best column, searching depth plies ahead
+    def __search(self, gb: GameBoard, depth: int, alpha: int, beta: int, ply: int):
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            if self.deadline is not None and time.perf_counter() > self.deadline: raise TimeoutError
+            if self.max_nodes is not None and self.nodes > self.max_nodes: raise TimeoutError
+            if self.stop is not None and self.stop.is_set(): raise TimeoutError
+
+        # Play every column once to look for an immediate win before searching any deeper, unless neither player can win anymore
+        columns = gb.legal_columns()
+        if not columns: return 0, None
+        if gb.is_draw(): return 0, min(columns, key=lambda c: abs(2 * c - gb.cols - 1))
+        p = gb.next_turn()
+        for c in columns:
+            gb.make_move(c)
+            won = gb.count_chains(p)
+            gb.unmake_move()
+            if won: return Solver.MATE - ply - 1, c
+        if depth == 1: return self.evaluate(gb), min(columns, key=lambda c: abs(2 * c - gb.cols - 1))
+
+        # Probe the transposition table, adjusting forced results from plies-from-here to plies-from-root
+        entry = self.table.get(gb.zobrist)
+        best = None
+        self.probes += 1
+        if entry is not None:
+            self.hits += 1
+            best = entry[3]
+            if entry[0] >= depth:
+                score = entry[2] - ply if entry[2] > Solver.MATE // 2 else entry[2] + ply if entry[2] < -Solver.MATE // 2 else entry[2]
+                if entry[1] == Solver.EXACT or (entry[1] == Solver.LOWER and score >= beta) or (entry[1] == Solver.UPPER and score <= alpha):
+                    return score, best
+
+        # Search the best column from the table first, then the remaining columns from the center outwards
+        order = sorted(columns, key=lambda c: (c != best, abs(2 * c - gb.cols - 1)))
+        original = alpha
+        best, best_score = order[0], -Solver.MATE
+        for c in order:
+            gb.make_move(c)
+            score = -self.__search(gb, depth - 1, -beta, -alpha, ply + 1)[0]
+            gb.unmake_move()
+            if score > best_score: best, best_score = c, score
+            if score > alpha: alpha = score
+            if alpha >= beta:
+                self.cutoffs += 1
+                break
+
+        # Store the result in the transposition table, evicting the oldest entry when it is full
+        flag = Solver.UPPER if best_score <= original else Solver.LOWER if best_score >= beta else Solver.EXACT
+        stored = best_score + ply if best_score > Solver.MATE // 2 else best_score - ply if best_score < -Solver.MATE // 2 else best_score
+        if gb.zobrist not in self.table and len(self.table) >= self.table_size: del self.table[next(iter(self.table))]
+        self.table[gb.zobrist] = (depth, flag, stored, best)
+        return best_score, best
+
+# Class represents a persistent store of solved positions, i.e., their score, distance, and best column, in an SQLite database
+# Positions are stored under their canonical key, so a position and its mirror image share one row, and best columns are mirrored
+# back on the way out. Recently used positions are also kept in memory, in front of the database, up to a capacity
+# The database is in write-ahead logging mode, so any number of processes can read it while one writes; readonly opens it for reading only
+class PositionCache:
+
+    # Define the default number of positions kept in memory
+    DEFAULT_CAPACITY = 100000
+
+    # Initialize the cache from the path of its database file, creating it if needed (unless readonly), and an optional capacity
+    def __init__(self, path: str, **kwargs):
+        import sqlite3
+        self.capacity = max(1, kwargs.get("capacity") or PositionCache.DEFAULT_CAPACITY)
+        self.lru = OrderedDict()
+        self.hits = self.misses = 0
+        if kwargs.get("readonly"):
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30, isolation_level=None, check_same_thread=False)
+        else:
+            self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS positions (key TEXT PRIMARY KEY, c INTEGER, score INTEGER, distance INTEGER)")
+
+    # Function returns the number of positions stored in the database
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    # Function returns the solved {"c", "score", "distance"} of the position on the game board, or None if it was never stored
+    def get(self, gb: GameBoard):
+        key, mirrored = gb.get_canonical_key()
+        if key in self.lru:
+            self.lru.move_to_end(key)
+            value = self.lru[key]
+        else:
+            value = self.db.execute("SELECT c, score, distance FROM positions WHERE key = ?", (key,)).fetchone()
+            if value is not None: self.__remember(key, value)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        c, score, distance = value
+        return {"c": gb.cols - c + 1 if mirrored else c, "score": score, "distance": distance}
+
+    # Function stores the solved {"c", "score", "distance"} of the position on the game board
+    def put(self, gb: GameBoard, result: dict):
+        key, mirrored = gb.get_canonical_key()
+        value = (gb.cols - result["c"] + 1 if mirrored else result["c"], result["score"], result["distance"])
+        self.db.execute("INSERT OR REPLACE INTO positions VALUES (?, ?, ?, ?)", (key, *value))
+        self.__remember(key, value)
+
+    # Function closes the database
+    def close(self):
+        self.db.close()
+
+    # Function keeps a position in memory, forgetting the least recently used position when over capacity
+    def __remember(self, key, value):
+        self.lru[key] = value
+        self.lru.move_to_end(key)
+        if len(self.lru) > self.capacity: self.lru.popitem(last=False)
+
+# Class represents a database of played games, with every position reached in every game indexed, in an SQLite database
+# Positions are indexed by a 64-bit key shared by a position and its mirror image (see get_key), in two tables clustered by key:
+# the games that reached each position, and, for each position and column played next (mirrored when the position is, 0 for none),
+# the number of games and how they ended, added up as games are ingested. So every query about a position is a single range scan,
+# and asking how games went from a position only reads a row per column, however many games reached it
+# The database is in write-ahead logging mode, so it can be queried while games are ingested
+class GameDatabase:
+
+    # Define the default number of games inserted per transaction by ingest
+    DEFAULT_BATCH = 10000
+
+    # Initialize the database from the path of its file, creating it if needed
+    def __init__(self, path: str):
+        import sqlite3
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA cache_size=-65536")
+        self.db.execute("CREATE TABLE IF NOT EXISTS games (id INTEGER PRIMARY KEY, rows INTEGER, cols INTEGER, lim INTEGER, result TEXT, moves TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS positions (key INTEGER, game INTEGER, PRIMARY KEY (key, game)) WITHOUT ROWID")
+        self.db.execute("CREATE TABLE IF NOT EXISTS continuations (key INTEGER, next INTEGER, games INTEGER, wins_1 INTEGER, wins_2 INTEGER, draws INTEGER, PRIMARY KEY (key, next)) WITHOUT ROWID")
+
+    # Function returns the number of games stored in the database
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    # Function returns the key of every position of a sequence of moves (dicts of "c", "r", and "player") on a game board of the given
+    # size and limit, from the empty game board on, along with whether each is the mirrored position's key
+    # Keys are the Zobrist hashes of the position and of its mirror image, kept side by side, the smaller of the two taken, and salted
+    # with the size and limit, so positions of different game boards never share a key; keys fit in SQLite's signed 64-bit integers
+    @staticmethod
+    def get_keys(rows: int, cols: int, limit: int, moves):
+        import hashlib
+        salt = int.from_bytes(hashlib.blake2b(f"{rows}x{cols}x{limit}".encode(), digest_size=8).digest(), "big")
+        z = zm = 0
+        keys = []
+        for move in [None, *moves]:
+            if move is not None:
+                z ^= GameBoard.ZOBRIST[((move["player"][0]-1) * (GameBoard.MAX_COLS+1) + move["c"]) * (GameBoard.MAX_ROWS+1) + move["r"]]
+                zm ^= GameBoard.ZOBRIST[((move["player"][0]-1) * (GameBoard.MAX_COLS+1) + cols - move["c"] + 1) * (GameBoard.MAX_ROWS+1) + move["r"]]
+            key = (min(z, zm) ^ salt) - (1 << 63)
+            keys.append((key, zm < z))
+        return keys
+
+    # Function returns the key of the position on a game board, and whether it is the mirrored position's key, see get_keys
+    def get_key(self, gb: GameBoard):
+        return GameDatabase.get_keys(gb.rows, gb.cols, gb.limit, gb.moves)[-1]
+
+    # Function replays one game per line of column numbers (as in headless) on game boards of the given rows, cols, and limit, and
+    # stores every game with all of its positions, in transactions of a batch of games; columns after a winning move are not played
+    # Games with a column that is not a number, out of range, or full are rejected. Lines are read a batch at a time, and batches
+    # are replayed across an optional number of worker processes (1 replays them in this process) while the previous ones are stored
+    # Function returns the number of games stored and rejected, and the number of positions indexed
+    def ingest(self, lines, **kwargs):
+        import itertools
+        batch = max(1, kwargs.get("batch") or GameDatabase.DEFAULT_BATCH)
+        size = { k: kwargs.get(k) for k in ("rows", "cols", "limit") }
+        workers = kwargs.get("workers") or os.cpu_count() or 1
+        tally = {"games": 0, "rejected": 0, "positions": 0}
+        game = (self.db.execute("SELECT MAX(id) FROM games").fetchone()[0] or 0) + 1
+        lines = iter(lines)
+        batches = iter(lambda: list(itertools.islice(lines, batch)), [])
+        if workers == 1:
+            replayed = ( replay_batch(b, **size) for b in batches )
+        else:
+            import collections
+            import concurrent.futures
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers = workers)
+            # Keep at most 2 batches per worker in flight, submitted as lines are read, so input is not read into memory up front
+            def window():
+                running = collections.deque()
+                while True:
+                    while len(running) < 2 * workers and (b := next(batches, None)) is not None:
+                        running.append(executor.submit(replay_batch, b, **size))
+                    if not running: return
+                    yield running.popleft().result()
+            replayed = window()
+        try:
+            for replays in replayed:
+                games, positions, continuations = [], [], {}
+                for replay in replays:
+                    if replay is None:
+                        tally["rejected"] += 1
+                        continue
+                    rows, cols, limit, result, columns, keys = replay
+                    games.append((game, rows, cols, limit, result, " ".join(map(str, columns))))
+                    outcome = (1, result == "1", result == "2", result == "draw")
+                    for ply, (key, mirrored) in enumerate(keys):
+                        c = columns[ply] if ply < len(columns) else 0
+                        positions.append((key, game))
+                        counts = continuations.setdefault((key, cols - c + 1 if mirrored and c else c), [0, 0, 0, 0])
+                        for i in range(4): counts[i] += outcome[i]
+                    game += 1
+                self.db.execute("BEGIN")
+                self.db.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?)", games)
+                self.db.executemany("INSERT OR IGNORE INTO positions VALUES (?, ?)", positions)
+                self.db.executemany("INSERT INTO continuations VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (key, next) DO UPDATE SET games = games + excluded.games, wins_1 = wins_1 + excluded.wins_1, wins_2 = wins_2 + excluded.wins_2, draws = draws + excluded.draws", [ (*k, *v) for k, v in continuations.items() ])
+                self.db.execute("COMMIT")
+                tally["games"] += len(games)
+                tally["positions"] += len(positions)
+        finally:
+            if workers != 1: executor.shutdown()
+        return tally
+
+    # Function returns the games that reached the position on a game board, as dicts of their id, columns played, and result,
+    # up to an optional limit on the number of games
+    def find_games(self, gb: GameBoard, **kwargs):
+        key = self.get_key(gb)[0]
+        rows = self.db.execute("SELECT g.id, g.moves, g.result FROM positions p JOIN games g ON g.id = p.game WHERE p.key = ? ORDER BY p.game LIMIT ?", (key, kwargs.get("limit") or -1))
+        return [ {"id": id, "moves": [ int(c) for c in moves.split() ], "result": result} for id, moves, result in rows ]
+
+    # Function returns how the games that reached the position on a game board ended: the number of games, wins of each player,
+    # draws, and games left open, and the win rate of each player and draw rate of the games that ended
+    def win_rate(self, gb: GameBoard):
+        games, a, b, draws = [ n or 0 for n in self.db.execute("SELECT SUM(games), SUM(wins_1), SUM(wins_2), SUM(draws) FROM continuations WHERE key = ?", (self.get_key(gb)[0],)).fetchone() ]
+        ended = a + b + draws
+        return {
+            "games": games,
+            "wins": {1: a, 2: b},
+            "draws": draws,
+            "open": games - ended,
+            "win_rate": {1: a / ended if ended else 0.0, 2: b / ended if ended else 0.0},
+            "draw_rate": draws / ended if ended else 0.0,
+        }
+
+    # Function returns the columns played next from the position on a game board, most common first, with the number of games that
+    # played each and how they ended, as in win_rate
+    def continuations(self, gb: GameBoard):
+        key, mirrored = self.get_key(gb)
+        rows = self.db.execute("SELECT next, games, wins_1, wins_2, draws FROM continuations WHERE key = ? AND next > 0 ORDER BY games DESC, next", (key,))
+        continuations = []
+        for c, games, a, b, draws in rows:
+            ended = a + b + draws
+            continuations.append({"c": gb.cols - c + 1 if mirrored else c, "games": games, "win_rate": {1: a / ended if ended else 0.0, 2: b / ended if ended else 0.0}, "draw_rate": draws / ended if ended else 0.0})
+        return continuations
+
+    # Function closes the database
+    def close(self):
+        self.db.close()
+
+# Function replays a batch of games for GameDatabase.ingest, one game per line of column numbers (see parse_games), on game boards
+# of the given rows, cols, and limit, as headless does, and returns for every game its rows, cols, limit, result (as in
+# replay_game), columns played, and position keys (see GameDatabase.get_keys), or None for a game with an illegal column
+def replay_batch(lines: list, **kwargs):
+    replays = []
+    for _, columns in parse_games(lines):
+        gb, result = replay_board(columns, rows = kwargs.get("rows"), cols = kwargs.get("cols"), limit = kwargs.get("limit"))
+        if result["result"] == "illegal":
+            replays.append(None)
+            continue
+        moves = list(gb.moves)
+        replays.append((gb.rows, gb.cols, gb.limit, result["result"], [ move["c"] for move in moves ], GameDatabase.get_keys(gb.rows, gb.cols, gb.limit, moves)))
+    return replays
+
+# Class represents an opening book, i.e., a file of the best column, score, and distance of every position up to some depth
+# The file is a header followed by fixed-size records sorted by the canonical hash of their position, see build_book
+# Lookups memory-map the file and binary search it, so opening a book costs nothing, and processes share its pages through the OS
+class OpeningBook:
+
+    # Define the header (magic, version, rows, cols, limit, depth, number of records) and record (hash, column, score, distance)
+    # layouts; columns are stored for the canonical position, and a distance of 255 means the result is not forced
+    HEADER = struct.Struct(">4sBBBBBI")
+    RECORD = struct.Struct(">QBhB")
+    MAGIC = b"CK4B"
+    VERSION = 1
+
+    # Initialize the book by memory-mapping its file
+    def __init__(self, path: str):
+        import mmap
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.limit, self.depth, self.count = OpeningBook.HEADER.unpack_from(self.map, 0)
+        if magic != OpeningBook.MAGIC or version != OpeningBook.VERSION: raise ValueError(f"{path} is not an opening book")
+
+    # Function returns the number of positions in the book
+    def __len__(self):
+        return self.count
+
+    # Function returns the {"c", "score", "distance"} of the position on the game board, or None if it is not in the book
+    def lookup(self, gb: GameBoard):
+        if (gb.rows, gb.cols, gb.limit) != (self.rows, self.cols, self.limit) or len(gb.moves) > self.depth: return None
+        key, mirrored = gb.get_canonical_hash()
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, c, score, distance = OpeningBook.RECORD.unpack_from(self.map, OpeningBook.HEADER.size + mid * OpeningBook.RECORD.size)
+            if k == key: return {"c": gb.cols - c + 1 if mirrored else c, "score": score, "distance": None if distance == 255 else distance}
+            if k < key: lo = mid + 1
+            else: hi = mid
+        return None
+
+    # Function unmaps the book's file
+    def close(self):
+        self.map.close()
+
+# Function returns the opening book at a path, opened once per process, so worker processes given a path share one mapping each
+@functools.cache
+def open_book(path: str):
+    return OpeningBook(path)
+
+# Function returns the game boards of every position reachable from a game board in up to depth moves, one per canonical position
+# Positions where the game is over are left out, as there is no move to choose in them
+def enumerate_positions(gb: GameBoard, depth: int):
+    positions = {}
+    gb = gb.copy()
+    def visit(d):
+        key = gb.get_canonical_hash()[0]
+        if key in positions: return
+        positions[key] = gb.copy()
+        if d == 0: return
+        p = gb.next_turn()
+        for c in gb.legal_columns():
+            gb.make_move(c)
+            if not gb.count_chains(p) and gb.legal_columns(): visit(d - 1)
+            gb.unmake_move()
+    if gb.legal_columns(): visit(depth)
+    return list(positions.values())
+
+# Function returns the opening book records (canonical hash, canonical column, score, distance) of a list of game boards
+def score_positions(boards: list, **kwargs):
+    solver = Solver()
+    records = []
+    for gb in boards:
+        result = solver.solve(gb, time = kwargs.get("think"), nodes = kwargs.get("nodes"))
+        key, mirrored = gb.get_canonical_hash()
+        c = gb.cols - result["c"] + 1 if mirrored else result["c"]
+        records.append((key, c, result["score"], 255 if result["distance"] is None else result["distance"]))
+    return records
+
+# Function builds an opening book file of every position up to depth moves on a game board of the given size and limit
+# Every position is solved, or scored within the think time (in seconds) or node budget per position, across worker processes
+# Function returns the number of positions written
+def build_book(path: str, **kwargs):
+    gb = GameBoard(rows = kwargs.get("rows"), cols = kwargs.get("cols"), limit = kwargs.get("limit"))
+    depth = kwargs.get("depth", 4)
+    boards = enumerate_positions(gb, depth)
+    options = {"think": kwargs.get("think", 0.1), "nodes": kwargs.get("nodes")}
+    workers = kwargs.get("workers") or os.cpu_count() or 1
+    chunks = [ boards[i:i+64] for i in range(0, len(boards), 64) ]
+    if workers == 1:
+        records = [ r for chunk in chunks for r in score_positions(chunk, **options) ]
+    else:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            records = [ r for result in executor.map(functools.partial(score_positions, **options), chunks) for r in result ]
+    records.sort()
+    with open(path, "wb") as f:
+        f.write(OpeningBook.HEADER.pack(OpeningBook.MAGIC, OpeningBook.VERSION, gb.rows, gb.cols, gb.limit, depth, len(records)))
+        for record in records:
+            f.write(OpeningBook.RECORD.pack(*record))
+    return len(records)
+
+# Class represents a node of a Monte Carlo search tree, i.e., the position reached by playing column c from its parent node
+# Wins are counted for the player who played column c, with a draw counting as half a win
+class MCTSNode:
+
+    __slots__ = ("c", "children", "untried", "visits", "wins")
+
+    # Initialize the node with the column played to reach it, and the columns that can still be played from it
+    def __init__(self, c, untried):
+        self.c = c
+        self.children = {}
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+# Function runs Monte Carlo tree search playouts from the game board, and returns the visits and wins of every root column
+# Every playout selects columns down the tree by their upper confidence bound, adds one new node, then plays random columns to
+# the end of the game on a copy of the game board, and takes every move back afterwards with unmake_move
+# Optional arguments are the number of playouts, a time budget in seconds, the exploration constant, and the random seed
+def mcts_playouts(gb: GameBoard, **kwargs):
+    rng = random.Random(kwargs.get("seed"))
+    playouts = kwargs.get("playouts")
+    deadline = time.perf_counter() + (kwargs.get("time") or 1.0) if kwargs.get("time") is not None or playouts is None else None
+    exploration = kwargs.get("exploration", MCTS.DEFAULT_EXPLORATION)
+    gb = gb.copy()
+    root = MCTSNode(None, gb.legal_columns())
+    first = gb.next_turn()
+    n = 0
+    while (playouts is None or n < playouts) and (deadline is None or n & 15 or time.perf_counter() < deadline):
+        n += 1
+        node, path, winner = root, [root], None
+
+        # Select the child with the best upper confidence bound until reaching a node with untried columns, or the end of the game
+        while winner is None and not node.untried and node.children:
+            log = math.log(node.visits)
+            node = max(node.children.values(), key=lambda child: child.wins / child.visits + exploration * math.sqrt(log / child.visits))
+            p = gb.next_turn()
+            gb.make_move(node.c)
+            path.append(node)
+            if gb.count_chains(p): winner = p[0]
+
+        # Expand the tree with one of the untried columns, unless the game is already over
+        if winner is None and node.untried:
+            c = node.untried.pop(rng.randrange(len(node.untried)))
+            p = gb.next_turn()
+            gb.make_move(c)
+            if gb.count_chains(p): winner = p[0]
+            node.children[c] = node = MCTSNode(c, [] if winner or gb.is_draw() else gb.legal_columns())
+            path.append(node)
+
+        # Play random columns to the end of the game, or until neither player can win anymore
+        depth = len(path) - 1
+        while winner is None and not gb.is_draw() and (columns := gb.legal_columns()):
+            p = gb.next_turn()
+            gb.make_move(rng.choice(columns))
+            depth += 1
+            if gb.count_chains(p): winner = p[0]
+
+        # Count the result for every node on the path, from the point of view of the player who moved into it, and take back the moves
+        for i, node in enumerate(path):
+            node.visits += 1
+            mover = first[0] if i % 2 == 1 else 3 - first[0]
+            node.wins += 1.0 if winner == mover else 0.5 if winner is None else 0.0
+        for _ in range(depth):
+            gb.unmake_move()
+    return {"playouts": n, "children": { c: (child.visits, child.wins) for c, child in root.children.items() }}
+
+# Class represents a Monte Carlo tree search player with root parallelization
+# Every worker process grows its own search tree from the same position with its own seed, and the visits and wins of the root
+# columns are added up across workers; the column visited most is played
+class MCTS:
+
+    # Define the default exploration constant of the upper confidence bound, i.e., about the square root of 2
+    DEFAULT_EXPLORATION = 1.4
+
+    # Initialize the player with optional number of worker processes (1 searches in this process), exploration constant, and seed
+    def __init__(self, **kwargs):
+        self.workers = kwargs.get("workers") or os.cpu_count() or 1
+        self.exploration = kwargs.get("exploration", MCTS.DEFAULT_EXPLORATION)
+        self.rng = random.Random(kwargs.get("seed"))
+        self.executor = None
+
+    # Function searches the game board within a time budget (in seconds) or a number of playouts, split across the workers
+    # Function returns the best column, along with the merged visits and win rate of every root column, and the number of playouts
+    def search(self, gb: GameBoard, **kwargs):
+        options = {"time": kwargs.get("time"), "exploration": self.exploration}
+        playouts = kwargs.get("playouts")
+        if playouts is None and options["time"] is None: options["time"] = 1.0
+        shares = [ None if playouts is None else playouts // self.workers + (i < playouts % self.workers) for i in range(self.workers) ]
+        if self.workers == 1:
+            results = [ mcts_playouts(gb, playouts = shares[0], seed = self.rng.getrandbits(64), **options) ]
+        else:
+            if self.executor is None:
+                import concurrent.futures
+                self.executor = concurrent.futures.ProcessPoolExecutor(max_workers = self.workers)
+            futures = [ self.executor.submit(mcts_playouts, gb, playouts = share, seed = self.rng.getrandbits(64), **options) for share in shares ]
+            results = [ future.result() for future in futures ]
+        visits, wins = {}, {}
+        for result in results:
+            for c, (n, w) in result["children"].items():
+                visits[c] = visits.get(c, 0) + n
+                wins[c] = wins.get(c, 0.0) + w
+        c = max(visits, key=lambda c: (visits[c], wins[c])) if visits else None
+        if STATS is not None:
+            count_stat("mcts.searches")
+            count_stat("mcts.playouts", sum(r["playouts"] for r in results))
+        return {"c": c, "visits": dict(sorted(visits.items())), "value": { c: wins[c] / visits[c] for c in sorted(visits) }, "playouts": sum(r["playouts"] for r in results)}
+
+    # Function shuts down the worker processes, if any were started
+    def close(self):
+        if self.executor is not None: self.executor.shutdown()
+        self.executor = None
+
+# Function returns the column a computer player chooses to play on the game board
+# Optional ai argument selects the engine ("negamax" by default, "mcts", or "random"), think sets its time budget in seconds,
+# and engine passes a Solver or MCTS player to reuse across moves; positions found in the optional OpeningBook book are not searched
+def choose_move(gb: GameBoard, **kwargs):
+    ai = kwargs.get("ai") or "negamax"
+    think = kwargs.get("think", 1.0)
+    if ai == "random": return random.choice(gb.legal_columns())
+    if kwargs.get("book") is not None and (entry := kwargs["book"].lookup(gb)) is not None: return entry["c"]
+    if ai == "mcts": return (kwargs.get("engine") or MCTS(workers = 1)).search(gb, time = think)["c"]
+    return (kwargs.get("engine") or Solver()).solve(gb, time = think)["c"]
+
+# Class represents a background search of a game board while the game waits for the player to type in a column, i.e., pondering
+# A thread first searches the player's own best column, which is the hint, and then every column the player could play, searching
+# the computer's reply to each, so the reply is known the moment the player's move is in
+# Searches run one at a time with the same Solver, for up to think seconds each, and are stopped as soon as the player moves
+# Replies to positions in the computer's opening book are not searched, so the book's column is played instead
+class Ponderer:
+
+    # Initialize the ponderer with an optional Solver to search with (shared with the computer player, once pondering is stopped),
+    # think time (in seconds) per search, whether to search the replies to the player's columns, or only the hint, and an optional
+    # OpeningBook the computer player looks positions up in
+    def __init__(self, **kwargs):
+        self.engine = kwargs.get("engine") or Solver()
+        self.think = kwargs.get("think", 1.0)
+        self.replies = kwargs.get("replies", True)
+        self.book = kwargs.get("book")
+        self.thread = None
+        self.key = None
+        self.best = None
+        self.results = {}
+        self.ready = None
+        self.stopped = None
+
+    # Function starts pondering a game board in the background, unless it is already pondering the same position
+    def start(self, gb: GameBoard):
+        import threading
+        if self.thread is not None and self.key == (gb.zobrist, len(gb.moves)): return
+        self.stop()
+        self.key, self.best, self.results = (gb.zobrist, len(gb.moves)), None, {}
+        self.ready, self.stopped = threading.Event(), threading.Event()
+        self.thread = threading.Thread(target=self.__ponder, args=(gb.copy(), self.ready, self.stopped), daemon=True)
+        self.thread.start()
+
+    # Function searches the hint, then the replies to every column from the center outwards, until done or stopped
+    def __ponder(self, gb: GameBoard, ready, stopped):
+        result = self.engine.solve(gb, time = self.think, stop = stopped)
+        if not stopped.is_set(): self.best = result["c"]
+        ready.set()
+        if not self.replies: return
+        for c in sorted(gb.legal_columns(), key=lambda c: abs(2 * c - gb.cols - 1)):
+            if stopped.is_set(): return
+            drop_chip(gb, c)
+            if game_result(gb) == "open" and (self.book is None or self.book.lookup(gb) is None):
+                result = self.engine.solve(gb, time = self.think, stop = stopped)
+                if not stopped.is_set(): self.results[gb.zobrist] = result
+            gb.pop_move()
+
+    # Function returns the best column for the player whose turn it is on the pondered game board, waiting for its search to end
+    def hint(self):
+        if self.ready is not None: self.ready.wait()
+        return self.best
+
+    # Function stops pondering, and returns the column searched in reply to the position of a game board, or None if there is none
+    def reply(self, gb: GameBoard):
+        self.stop()
+        result = self.results.get(gb.zobrist)
+        return result["c"] if result is not None else None
+
+    # Function stops the background search, and waits for its thread to end
+    def stop(self):
+        if self.thread is None: return
+        self.stopped.set()
+        self.ready.set()
+        self.thread.join()
+        self.thread = None
+
+# Class represents a terminal renderer that draws a game board once, and then only redraws what changed after every move
+# Instead of clearing the screen, every new chip is drawn by moving the cursor to its cell with ANSI escape codes, and the turn
+# line and prompt below the grid are rewritten; the whole screen is only redrawn when the terminal is resized or moves are taken back
+# Screen lines are laid out as rendered by GameBoard.render, i.e., 4 header lines, one line per row, a blank line, and the prompt
+class TerminalRenderer:
+
+    # Initialize the renderer for a game board, writing to standard output unless another output stream is provided
+    def __init__(self, gb: GameBoard, **kwargs):
+        self.gb = gb
+        self.out = kwargs.get("out") or sys.stdout
+        self.size = None
+        self.drawn = None
+
+    # Function clears the screen and draws the whole game board and prompt
+    def draw(self, prompt: str = ""):
+        self.size = shutil.get_terminal_size()
+        self.drawn = len(self.gb.moves)
+        self.out.write("\033[H\033[2J" + self.gb.render() + "\n" + prompt)
+        self.out.flush()
+
+    # Function draws the chips dropped since the last draw or update, then rewrites the turn line and prompt
+    # Cursor positions are absolute, so the whole screen is redrawn instead when the game board does not fit in the terminal
+    def update(self, prompt: str = ""):
+        size = shutil.get_terminal_size()
+        if self.drawn is None or self.drawn > len(self.gb.moves) or self.size != size or size.lines < self.gb.rows + 9:
+            self.draw(prompt)
+            return
+        s = []
+        for move in self.gb.moves[self.drawn:]:
+            s.append(f"\033[{4 + self.gb.rows - move['r'] + 1};{2 * (move['c'] - 1) + 1}H{self.gb.draw_player(self.gb.get_player(move['c'], move['r']))}")
+        self.drawn = len(self.gb.moves)
+        s.append(f"\033[{self.gb.rows + 6};1H\033[J{prompt}")
+        self.out.write("".join(s))
+        self.out.flush()
+
+# Class represents a batch of k game boards of the same size and limit, all stored together in NumPy arrays and played in lockstep
+# Boards are held in a (k, rows, cols) array of player numbers (0 for an open cell), with row index 0 being the bottom row,
+# alongside a (k, cols) array of column heights, so a whole batch of moves is a handful of array operations
+# Win detection runs for every board at once, using sliding-window sums of limit cells along the four directions
+# Boards that are won or full are marked done, and are left untouched by any further moves
+class BatchBoard:
+
+    # Initialize k game boards with the same row, column, and limit sizes as a GameBoard, or copies of a GameBoard's position
+    def __init__(self, k: int, **kwargs):
+        global np
+        if np is None: import numpy as np
+        gb = kwargs.get("gb") or GameBoard(rows = kwargs.get("rows"), cols = kwargs.get("cols"), limit = kwargs.get("limit"))
+        self.rows, self.cols, self.limit = gb.rows, gb.cols, gb.limit
+        self.board = np.zeros((k, self.rows, self.cols), dtype=np.int8)
+        self.heights = np.zeros((k, self.cols), dtype=np.int8)
+        self.moves = np.full(k, len(gb.moves), dtype=np.int16)
+        self.winner = np.zeros(k, dtype=np.int8)
+        for r, row in gb.board.items():
+            for c, p in enumerate(row):
+                if gb.is_valid_player(p): self.board[:, r-1, c] = p[0]
+        self.heights[:] = gb.heights
+        if gb.moves and find_winner(gb, mode = "lastmove") is not None: self.winner[:] = gb.get_lastmove()["player"][0]
+        self.done = (self.winner != 0) | (self.moves == self.rows * self.cols)
+
+    # Function returns the number of game boards in the batch
+    def __len__(self):
+        return len(self.board)
+
+    # Function returns the player number whose turn it is on every game board, i.e., 1 for PLAYER_A and 2 for PLAYER_B
+    def next_turn(self):
+        return (1 + self.moves % 2).astype(np.int8)
+
+    # Function returns a (k, cols) array of whether each column can still be played on each game board
+    def legal_columns(self):
+        return (self.heights < self.rows) & ~self.done[:, None]
+
+    # Function drops a chip for the player whose turn it is in the given column (1 to cols) of every game board at once
+    # Boards that are done, or whose column is out of range or full, are skipped; the returned array tells which boards played
+    def drop_chip(self, c):
+        c = np.asarray(c, dtype=np.int64)
+        ok = ~self.done & (c >= 1) & (c <= self.cols)
+        idx = np.nonzero(ok)[0]
+        ok[idx] = self.heights[idx, c[idx]-1] < self.rows
+        idx = np.nonzero(ok)[0]
+        cols = c[idx] - 1
+        self.board[idx, self.heights[idx, cols], cols] = self.next_turn()[idx]
+        self.heights[idx, cols] += 1
+        self.moves[idx] += 1
+        self.winner[idx] = self.find_winner(idx)
+        self.done[idx] = (self.winner[idx] != 0) | (self.moves[idx] == self.rows * self.cols)
+        return ok
+
+    # Function returns the winning player number (0 for none) of the game boards at the given indexes (all boards by default)
+    # Only the player who made the last move on each board is inspected, as the other player could not have just won
+    def find_winner(self, idx = None):
+        if idx is None: idx = np.arange(len(self))
+        k = self.limit
+        p = (2 - self.moves[idx] % 2).astype(np.int8)
+        plane = (self.board[idx] == p[:, None, None]).astype(np.int16)
+        won = np.zeros(len(idx), dtype=bool)
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            span_r, span_c = (k-1) * dr, (k-1) * abs(dc)
+            if span_r >= self.rows or span_c >= self.cols: continue
+            window = np.zeros((len(idx), self.rows - span_r, self.cols - span_c), dtype=np.int16)
+            for i in range(k):
+                c0 = i * dc if dc >= 0 else span_c - i
+                window += plane[:, i*dr : i*dr + self.rows - span_r, c0 : c0 + self.cols - span_c]
+            won |= (window == k).any(axis=(1, 2))
+        return np.where(won, p, 0).astype(np.int8)
+
+    # Function plays random columns on every game board until all of them are done, and returns the winning player numbers
+    def rollout(self, rng = None):
+        rng = rng if rng is not None else np.random.default_rng()
+        while not self.done.all():
+            weights = np.where(self.legal_columns(), rng.random((len(self), self.cols)), -1.0)
+            self.drop_chip(np.where(self.done, 0, weights.argmax(axis=1) + 1))
+        return self.winner
+
+# Function returns a random column to play on the game board; this is the default policy of the self-play simulator
+# A policy is any picklable function taking a game board and a random number generator and returning a column to play
+def random_policy(gb: GameBoard, rng: random.Random):
+    return rng.choice(gb.legal_columns())
+
+# Function returns a policy that plays the column of an opening book for the positions in it, and asks the given policy otherwise
+def book_policy(policy, book: OpeningBook):
+    def play(gb: GameBoard, rng: random.Random):
+        entry = book.lookup(gb)
+        return entry["c"] if entry is not None else policy(gb, rng)
+    return play
+
+# Function plays a complete game on the game board, with each player choosing their columns from their own policy
+# Function returns the winning player number (0 for a draw) and the number of moves played
+def play_game(gb: GameBoard, policies: tuple, rng: random.Random):
+    while gb.legal_columns():
+        p = gb.next_turn()
+        if not drop_chip(gb, policies[p[0]-1](gb, rng), p = p): continue
+        if len(gb.moves) >= gb.limit * 2 - 1 and find_winner(gb, mode = "lastmove") is not None: return p[0], len(gb.moves)
+        if gb.is_draw(): break
+    return 0, len(gb.moves)
+
+# Function plays a number of games with a random number generator seeded from its own seed, and returns their tallies
+# Tallies are kept as plain dicts of counts so that tallies coming back from worker processes can simply be added up
+def simulate_games(n: int, seed: int, **kwargs):
+    rng = random.Random(seed)
+    policies = kwargs.get("policies") or (random_policy, random_policy)
+    if kwargs.get("book"): policies = tuple( book_policy(policy, open_book(kwargs["book"])) for policy in policies )
+    tally = {"games": 0, "wins": {1: 0, 2: 0}, "draws": 0, "lengths": {}, "first_move": {}}
+    for _ in range(n):
+        gb = GameBoard(rows = kwargs.get("rows"), cols = kwargs.get("cols"), limit = kwargs.get("limit"), backend = kwargs.get("backend"))
+        winner, length = play_game(gb, policies, rng)
+        first = tally["first_move"].setdefault(gb.moves[0]["c"], {"games": 0, "wins": {1: 0, 2: 0}, "draws": 0})
+        for t in (tally, first):
+            t["games"] += 1
+            if winner: t["wins"][winner] += 1
+            else: t["draws"] += 1
+        tally["lengths"][length] = tally["lengths"].get(length, 0) + 1
+    return tally
+
+# Function adds the counts of one simulator tally into another, and returns the latter
+def merge_tally(total: dict, tally: dict):
+    for k, v in tally.items():
+        if isinstance(v, dict):
+            merge_tally(total.setdefault(k, {}), v)
+        else:
+            total[k] = total.get(k, 0) + v
+    return total
+
+# Function plays n complete self-play games, spread across a pool of worker processes, and returns their aggregate stats
+# Games are split into chunks, each played with its own seeded random number generator, so results for a seed do not depend
+# on the number of workers. Optional arguments are the rows, cols, limit, and backend of the game boards, the two players'
+# policies, the path of an opening book both players play from first, the number of worker processes (1 plays every game in
+# this process), the number of games per chunk, and the seed
+def simulate(n: int, **kwargs):
+    workers = kwargs.get("workers") or os.cpu_count() or 1
+    seed = kwargs.get("seed")
+    if seed is None: seed = random.randrange(1 << 32)
+    options = { k: kwargs.get(k) for k in ("rows", "cols", "limit", "backend", "policies", "book") }
+    chunk = max(1, kwargs.get("chunk") or 1000)
+    chunks = [ (min(chunk, n - i), seed * 1000003 + i // chunk) for i in range(0, n, chunk) ]
+    start = time.perf_counter()
+    total = {}
+    if workers == 1:
+        for size, s in chunks:
+            merge_tally(total, simulate_games(size, s, **options))
+    else:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            futures = [ executor.submit(simulate_games, size, s, **options) for size, s in chunks ]
+            for future in concurrent.futures.as_completed(futures):
+                merge_tally(total, future.result())
+    games = total.get("games", 0)
+    wins = total.get("wins", {1: 0, 2: 0})
+    return {
+        "games": games,
+        "seed": seed,
+        "seconds": round(time.perf_counter() - start, 3),
+        "win_rate": { p: wins.get(p, 0) / games if games else 0.0 for p in (1, 2) },
+        "draw_rate": total.get("draws", 0) / games if games else 0.0,
+        "first_move_advantage": (wins.get(1, 0) - wins.get(2, 0)) / games if games else 0.0,
+        "lengths": dict(sorted(total.get("lengths", {}).items())),
+        "first_move": { c: {"games": t["games"], "win_rate": { p: t["wins"].get(p, 0) / t["games"] for p in (1, 2) }, "draw_rate": t["draws"] / t["games"]} for c, t in sorted(total.get("first_move", {}).items()) },
+    }
+
+# Function returns the column the negamax engine plays on the game board within a budget of nodes (1000 by default)
+def negamax_policy(gb: GameBoard, rng: random.Random, budget: int = 1000):
+    return Solver(table_size = budget).solve(gb, nodes = budget)["c"]
+
+# Function returns the column most visited by a single Monte Carlo tree search of the game board within a number of playouts
+# (200 by default), with its seed drawn from the random number generator
+def mcts_policy(gb: GameBoard, rng: random.Random, budget: int = 200):
+    children = mcts_playouts(gb, playouts = budget, seed = rng.getrandbits(64))["children"]
+    return max(children, key=lambda c: children[c])
+
+# Define the agents a tournament can be played between, by name; each is a policy as in random_policy, taking an optional budget
+AGENTS = {"random": random_policy, "negamax": negamax_policy, "mcts": mcts_policy}
+
+# Function returns the policy of an agent given as "name" or "name:budget", e.g., "negamax:5000" for a 5,000 node negamax search
+# Budgets are counted in nodes or playouts rather than seconds, so games between agents play out the same on every machine
+def make_agent(spec: str):
+    name, _, budget = spec.partition(":")
+    if name not in AGENTS or (budget and not budget.isdecimal()): raise ValueError(f"unknown agent {spec}")
+    return functools.partial(AGENTS[name], budget = int(budget)) if budget else AGENTS[name]
+
+# Function plays a match of two games between two agents from the same random opening of a few moves (2 by default), with the
+# agents swapping seats for the second game, and returns the two scores of the first agent: 1 for a win, 0.5 for a draw, 0 for a loss
+# Optional arguments are the rows, cols, and limit of the game board, the number of opening moves, and the path of an opening
+# book both agents play from first
+def play_match(specs: tuple, seed: int, **kwargs):
+    rng = random.Random(seed)
+    agents = [ make_agent(spec) for spec in specs ]
+    if kwargs.get("book"): agents = [ book_policy(agent, open_book(kwargs["book"])) for agent in agents ]
+    gb = GameBoard(rows = kwargs.get("rows"), cols = kwargs.get("cols"), limit = kwargs.get("limit"))
+    for _ in range(kwargs.get("opening", 2)):
+        drop_chip(gb, rng.choice(gb.legal_columns()))
+        if game_result(gb) != "open":
+            gb.pop_move()
+            break
+    scores = []
+    for seats in ((0, 1), (1, 0)):
+        winner, _ = play_game(gb.copy(), (agents[seats[0]], agents[seats[1]]), random.Random(rng.getrandbits(64)))
+        scores.append(0.5 if winner == 0 else 1.0 if seats[winner - 1] == 0 else 0.0)
+    return scores
+
+# Function returns the Elo rating difference for a record of wins, draws, and losses, along with the bounds of its confidence interval
+# (95% by default, for a z of 1.96), from the mean score and its standard error; scores of 0 and 1 are capped at about 1200 Elo
+def elo_interval(wins: int, draws: int, losses: int, z: float = 1.96):
+    n = wins + draws + losses
+    if n == 0: return 0.0, 0.0, 0.0
+    s = (wins + draws / 2) / n
+    se = math.sqrt((wins * (1 - s) ** 2 + draws * (0.5 - s) ** 2 + losses * s ** 2) / n / n)
+    elo = lambda x: -400 * math.log10(1 / min(max(x, 0.001), 0.999) - 1)
+    return round(elo(s), 1), round(elo(s - z * se), 1), round(elo(s + z * se), 1)
+
+# Function returns the log-likelihood ratio of an Elo difference of elo1 against one of elo0 for a record of wins, draws, and
+# losses, as in the generalized sequential probability ratio test, i.e., from a normal approximation of the mean score
+# Half a game is added to every outcome, so a one-sided record does not have a variance of 0
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float):
+    wins, draws, losses = wins + 0.5, draws + 0.5, losses + 0.5
+    n = wins + draws + losses
+    s = (wins + draws / 2) / n
+    var = (wins * (1 - s) ** 2 + draws * (0.5 - s) ** 2 + losses * s ** 2) / n
+    s0, s1 = ( 1 / (1 + 10 ** (-elo / 400)) for elo in (elo0, elo1) )
+    return n * (s1 - s0) * (2 * s - s0 - s1) / (2 * var)
+
+# Function returns whether a record of wins, draws, and losses settles that its agents differ, with two sequential probability
+# ratio tests of an Elo difference of 0 against one of elo (100 by default) either way, each with half the false positive rate alpha
+# (5% by default) and a false negative rate beta (5% by default); unlike a confidence interval, the test may be checked after every game
+def sprt_settled(wins: int, draws: int, losses: int, **kwargs):
+    elo = kwargs.get("elo") or 100
+    bound = math.log((1 - kwargs.get("beta", 0.05)) / (kwargs.get("alpha", 0.05) / 2))
+    return sprt_llr(wins, draws, losses, 0, elo) >= bound or sprt_llr(wins, draws, losses, 0, -elo) >= bound
+
+# Function returns the standings of a tournament from the records of every pairing, i.e., for every agent and every pairing, the
+# games played, wins, draws, losses, score, and Elo rating difference (of an agent against all of its opponents) with its interval
+def tournament_standings(agents: list, records: dict):
+    standings = {"agents": {}, "pairs": {}}
+    totals = { a: [0, 0, 0] for a in agents }
+    for (i, j), (w, d, l) in records.items():
+        totals[agents[i]] = [ x + y for x, y in zip(totals[agents[i]], (w, d, l)) ]
+        totals[agents[j]] = [ x + y for x, y in zip(totals[agents[j]], (l, d, w)) ]
+        elo, low, high = elo_interval(w, d, l)
+        standings["pairs"][f"{agents[i]} vs {agents[j]}"] = {"games": w + d + l, "wins": w, "draws": d, "losses": l, "elo": elo, "elo_low": low, "elo_high": high}
+    for a, (w, d, l) in totals.items():
+        elo, low, high = elo_interval(w, d, l)
+        standings["agents"][a] = {"games": w + d + l, "wins": w, "draws": d, "losses": l, "score": (w + d / 2) / (w + d + l) if w + d + l else 0.0, "elo": elo, "elo_low": low, "elo_high": high}
+    standings["agents"] = dict(sorted(standings["agents"].items(), key=lambda item: -item[1]["score"]))
+    return standings
+
+# Function plays a tournament between agents (as in make_agent), round-robin by default or a gauntlet of the first agent against
+# every other, spread across a pool of worker processes, and yields the standings as they stand every few matches and at the end
+# Every pairing plays matches of two games with swapped seats (see play_match) until it has played a number of games (100 by
+# default), or, after a minimum of games (20 by default), as soon as a sequential test settles that its agents differ (see sprt_settled)
+# Optional arguments are the rows, cols, and limit, the number of opening moves, the path of an opening book (see play_match),
+# the games and minimum games per pairing, the Elo difference, alpha, and beta of the sequential test, the number of worker processes, the seed, and the number of matches
+# between standings (10 by default)
+def tournament(agents: list, **kwargs):
+    for spec in agents: make_agent(spec)
+    names = [ spec if agents.count(spec) == 1 else f"{spec}#{i+1}" for i, spec in enumerate(agents) ]
+    pairs = [ (0, j) for j in range(1, len(agents)) ] if kwargs.get("gauntlet") else [ (i, j) for i in range(len(agents)) for j in range(i + 1, len(agents)) ]
+    games = max(2, kwargs.get("games") or 100)
+    minimum = kwargs.get("min_games", 20)
+    sprt = { k: kwargs[k] for k in ("elo", "alpha", "beta") if kwargs.get(k) is not None }
+    workers = kwargs.get("workers") or os.cpu_count() or 1
+    every = max(1, kwargs.get("every") or 10)
+    seed = kwargs.get("seed")
+    if seed is None: seed = random.randrange(1 << 32)
+    options = { k: kwargs.get(k) for k in ("rows", "cols", "limit", "book") }
+    if kwargs.get("opening") is not None: options["opening"] = kwargs["opening"]
+    records = { pair: [0, 0, 0] for pair in pairs }
+    scheduled = { pair: 0 for pair in pairs }
+    settled = set()
+    matches = 0
+
+    # Function returns the next pairing to schedule a match for, i.e., the unsettled pairing with the fewest games so far, if any
+    def next_pair():
+        open_pairs = [ pair for pair in pairs if pair not in settled and scheduled[pair] < games ]
+        return min(open_pairs, key=lambda pair: scheduled[pair]) if open_pairs else None
+
+    # Function adds the scores of a match to the record of its pairing, and settles the pairing once its result is clear
+    def record(pair, scores):
+        for score in scores: records[pair][0 if score == 1.0 else 1 if score == 0.5 else 2] += 1
+        if sum(records[pair]) >= games or (sum(records[pair]) >= minimum and sprt_settled(*records[pair], **sprt)): settled.add(pair)
+
+    # Function schedules a match for a pairing, returning its arguments
+    def schedule(pair):
+        scheduled[pair] += 2
+        return (agents[pair[0]], agents[pair[1]]), seed * 1000003 + pairs.index(pair) * 100003 + scheduled[pair]
+
+    if workers == 1:
+        while (pair := next_pair()) is not None:
+            record(pair, play_match(*schedule(pair), **options))
+            matches += 1
+            if matches % every == 0: yield {"done": False, "matches": matches, "seed": seed, **tournament_standings(names, records)}
+    else:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            running = {}
+            while True:
+                while len(running) < 2 * workers and (pair := next_pair()) is not None:
+                    running[executor.submit(play_match, *schedule(pair), **options)] = pair
+                if not running: break
+                done, _ = concurrent.futures.wait(running, return_when = concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    record(running.pop(future), future.result())
+                    matches += 1
+                    if matches % every == 0: yield {"done": False, "matches": matches, "seed": seed, **tournament_standings(names, records)}
+    yield {"done": True, "matches": matches, "seed": seed, **tournament_standings(names, records)}
+
+# Function plays a sequence of columns on a new game board without rendering, and returns the result of the game
+# Result is "1" or "2" for the winning player number, "draw" once neither player can win anymore (see GameBoard.is_draw),
+# "open" if the game is not over yet, or "illegal" if a column is not a number, out of range, or full, in which case error_index
+# is the index of the offending move. Columns after a winning move, or once the game board is full, are not played; win_index is
+# the index of the winning move in the sequence
+def replay_game(moves: list, **kwargs):
+    return replay_board(moves, **kwargs)[1]
+
+# Function plays a sequence of columns on a new game board as replay_game does, and returns the game board along with the result
+def replay_board(moves: list, **kwargs):
+    gb = GameBoard(rows = kwargs.get("rows"), cols = kwargs.get("cols"), limit = kwargs.get("limit"), backend = kwargs.get("backend"))
+    result = {"result": "open", "winner": None, "win_index": None, "error_index": None, "moves": 0, "position": None}
+    for i, c in enumerate(moves):
+        if not (isinstance(c, int) or (isinstance(c, str) and c.isdecimal())) or not drop_chip(gb, int(c)):
+            result["result"], result["error_index"] = "illegal", i
+            break
+        if find_winner(gb, mode = "lines") is not None:
+            result["result"], result["winner"], result["win_index"] = str(gb.get_lastmove()["player"][0]), gb.get_lastmove()["player"][0], i
+            break
+        if not gb.legal_columns(): break
+    if result["result"] == "open" and gb.is_draw(): result["result"] = "draw"
+    result["moves"] = len(gb.moves)
+    result["position"] = gb.get_position()
+    return gb, result
+
+# Function yields the line number and columns of every game in lines, one game per line of column numbers, separated by spaces
+# or commas; blank lines and lines starting with "#" are skipped
+def parse_games(lines):
+    for n, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"): continue
+        yield n, line.replace(",", " ").split()
+
+# Function replays one game per line of column numbers (see parse_games), and yields the result of every game
+# Game is the line number the game was read from
+def headless(lines, **kwargs):
+    for n, columns in parse_games(lines):
+        yield {"game": n, **replay_game(columns, **kwargs)}
+
+# Function returns the result of the game on a game board: "1" or "2" for the winning player number, "draw" once neither player
+# can win anymore (see GameBoard.is_draw), or "open" if the game is not over yet; only the last move is inspected for a win
+def game_result(gb: GameBoard):
+    if gb.moves and find_winner(gb, mode = "lines") is not None: return str(gb.get_lastmove()["player"][0])
+    return "draw" if gb.is_draw() else "open"
+
+# Function returns the asyncio address of a server given as "host:port", ":port", or a path, i.e., ("tcp", host, port) or
+# ("unix", path, None); a host left out is localhost
+def parse_address(address: str):
+    host, _, port = address.rpartition(":")
+    if port.isdecimal() and "/" not in address: return "tcp", host or "127.0.0.1", int(port)
+    return "unix", address, None
+
+# Class represents a server hosting any number of concurrent games over a line-based protocol on a TCP or Unix socket
+# Every connection plays one game at a time as PLAYER_A against the computer if the server has an ai engine, or as both players
+# Commands and replies are one line each, with words separated by spaces:
+# 1. "NEW [rows [cols [limit]]]" starts a new game, replying "OK rows cols limit" with the sizes after clamping
+# 2. "c" or "MOVE c" drops a chip in column c, replying "OK result c [reply]" where result is as in game_result, and reply is the
+#    column the computer played in return, if it did
+# 3. "BOARD" replies "OK result position" with the position of the game board as in GameBoard.get_position
+# 4. "QUIT" replies "BYE" and closes the connection
+# Anything else, an illegal column, or a move without a game or after it is over, replies "ERR reason"
+# The computer player searches in a pool of worker processes (or a thread, for 1 worker), so it never blocks the event loop
+# Positions in the opening book, if any, are looked up in the event loop instead, as a lookup is a quick binary search
+class GameServer:
+
+    # Initialize the server with optional default rows, cols, limit, and backend of new games, the ai engine ("random" or
+    # "negamax") and its think time per move, the path of an opening book, and the number of worker processes it searches in
+    def __init__(self, **kwargs):
+        self.options = { k: kwargs.get(k) for k in ("rows", "cols", "limit", "backend") }
+        self.book = open_book(kwargs["book"]) if kwargs.get("book") else None
+        self.ai = kwargs.get("ai")
+        self.think = kwargs.get("think", 1.0)
+        self.workers = kwargs.get("workers") or os.cpu_count() or 1
+        self.executor = None
+        self.games = 0
+        self.moves = 0
+
+    # Function handles one connection, replying to every command until the client quits or disconnects
+    async def handle(self, reader, writer):
+        gb = None
+        try:
+            while line := await reader.readline():
+                words = line.decode(errors="replace").split()
+                if not words: continue
+                command = words[0].upper()
+                if command == "QUIT":
+                    writer.write(b"BYE\n")
+                    break
+                if command == "NEW":
+                    sizes = [ int(w) if w.lstrip("-").isdecimal() else None for w in words[1:4] ] + [None] * 3
+                    gb = GameBoard(rows = sizes[0] or self.options["rows"], cols = sizes[1] or self.options["cols"], limit = sizes[2] or self.options["limit"], backend = self.options["backend"])
+                    self.games += 1
+                    reply = f"OK {gb.rows} {gb.cols} {gb.limit}"
+                elif command == "BOARD":
+                    reply = f"OK {game_result(gb)} {gb.get_position()}" if gb is not None else "ERR no game"
+                else:
+                    reply = await self.play(gb, words[1:] if command == "MOVE" else words)
+                writer.write((reply + "\n").encode())
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    # Function drops the player's chip in the column given by the first word, and the computer's reply if the game is still open
+    async def play(self, gb: GameBoard, words: list):
+        if gb is None: return "ERR no game"
+        if game_result(gb) != "open": return "ERR game over"
+        if not words or not words[0].isdecimal(): return "ERR not a column"
+        if not drop_chip(gb, int(words[0])): return "ERR illegal column"
+        played = [words[0]]
+        self.moves += 1
+        if (result := game_result(gb)) == "open" and self.ai is not None:
+            import asyncio
+            entry = self.book.lookup(gb) if self.book is not None else None
+            c = entry["c"] if entry is not None else await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(choose_move, gb.copy(), ai = self.ai, think = self.think))
+            drop_chip(gb, c)
+            played.append(str(c))
+            self.moves += 1
+            result = game_result(gb)
+        return f"OK {result} {' '.join(played)}"
+
+    # Function listens on an address as in parse_address, and serves connections until cancelled; ready is called once listening
+    async def serve(self, address: str, ready = None):
+        import asyncio
+        if self.ai is not None and self.workers > 1 and self.executor is None:
+            import concurrent.futures
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers = self.workers)
+        kind, host, port = parse_address(address)
+        server = await (asyncio.start_server(self.handle, host, port) if kind == "tcp" else asyncio.start_unix_server(self.handle, host))
+        try:
+            async with server:
+                if ready is not None: ready(server)
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    # Function shuts down the worker processes, if any were started
+    def close(self):
+        if self.executor is not None: self.executor.shutdown()
+        self.executor = None
+
+# Function plays games against a GameServer at an address from a number of concurrent clients, each client playing random legal
+# columns over its own connection until the given number of games have been played, and returns the number of games and moves,
+# the moves per second, and the median and 99th percentile latencies of a move (from sending the column to its reply)
+# Optional arguments are the number of games (100 by default), clients (10 by default), the rows, cols, and limit of the games,
+# and the seed of the random columns
+async def load_test(address: str, **kwargs):
+    import asyncio
+    games = kwargs.get("games") or 100
+    rng = random.Random(kwargs.get("seed"))
+    sizes = " ".join(str(kwargs.get(k) or 0) for k in ("rows", "cols", "limit"))
+    latencies, errors, started = [], [0], [0]
+
+    # Function plays games over one connection until enough games have been started
+    async def client():
+        kind, host, port = parse_address(address)
+        reader, writer = await (asyncio.open_connection(host, port) if kind == "tcp" else asyncio.open_unix_connection(host))
+        while started[0] < games:
+            started[0] += 1
+            writer.write(f"NEW {sizes}\n".encode())
+            await writer.drain()
+            words = (await reader.readline()).decode().split()
+            gb = GameBoard(rows = int(words[1]), cols = int(words[2]), limit = int(words[3]))
+            result = "open"
+            while result == "open":
+                start = time.perf_counter()
+                writer.write(f"{rng.choice(gb.legal_columns())}\n".encode())
+                await writer.drain()
+                words = (await reader.readline()).decode().split()
+                latencies.append(time.perf_counter() - start)
+                if not words or words[0] != "OK":
+                    errors[0] += 1
+                    break
+                result = words[1]
+                for c in words[2:]: drop_chip(gb, int(c))
+        writer.write(b"QUIT\n")
+        await writer.drain()
+        await reader.readline()
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[ client() for _ in range(max(1, min(kwargs.get("clients") or 10, games))) ])
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "games": started[0],
+        "moves": len(latencies),
+        "errors": errors[0],
+        "seconds": round(seconds, 3),
+        "moves_per_sec": round(len(latencies) / seconds, 1) if seconds > 0 else 0.0,
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3) if latencies else None,
+        "p99_ms": round(latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000, 3) if latencies else None,
+    }
+
+# Function counts the move sequences of up to depth more moves from the game board, adding the hash of every position reached to seen
+# A sequence ends after depth moves, on a winning move, or on a full game board; function returns the sequences and positions counted
+def perft_count(gb: GameBoard, depth: int, mode: str, seen: set):
+    columns = gb.legal_columns()
+    if depth == 0 or not columns: return 1, 0
+    sequences = nodes = 0
+    for c in columns:
+        gb.make_move(c)
+        seen.add(gb.zobrist)
+        nodes += 1
+        if find_winner(gb, mode = mode) is not None:
+            sequences += 1
+        else:
+            n, m = perft_count(gb, depth - 1, mode, seen)
+            sequences, nodes = sequences + n, nodes + m
+        gb.unmake_move()
+    return sequences, nodes
+
+# Function counts the move sequences from the game board after first playing column c, and returns them with the hashes seen
+def perft_subtree(gb: GameBoard, c: int, depth: int, mode: str):
+    gb = gb.copy()
+    gb.make_move(c)
+    seen = {gb.zobrist}
+    if find_winner(gb, mode = mode) is not None: return 1, 1, seen
+    sequences, nodes = perft_count(gb, depth - 1, mode, seen)
+    return sequences, nodes + 1, seen
+
+# Function counts the legal move sequences and the unique positions reachable in up to depth moves from the game board
+# Every column of the first move is a subtree counted by its own worker process, and the positions seen are merged across workers
+# Optional arguments are the backend to copy the game board to, the find_winner mode used to end sequences, and the number of workers
+# Function returns the counts along with the share of positions reached more than once (dedupe rate), and the nodes per second
+def perft(gb: GameBoard, depth: int, **kwargs):
+    if kwargs.get("backend") is not None:
+        board = GameBoard(rows = gb.rows, cols = gb.cols, limit = gb.limit, backend = kwargs["backend"])
+        for move in gb.moves:
+            board.set_player(move["c"], move["r"], move["player"])
+        gb = board
+    mode = kwargs.get("mode", "lines")
+    workers = kwargs.get("workers") or os.cpu_count() or 1
+    start = time.perf_counter()
+    over = len(gb.moves) > 0 and find_winner(gb, mode = mode) is not None
+    columns = [] if depth <= 0 or over else gb.legal_columns()
+    if workers == 1:
+        results = [ perft_subtree(gb, c, depth, mode) for c in columns ]
+    else:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            results = list(executor.map(perft_subtree, [gb] * len(columns), columns, [depth] * len(columns), [mode] * len(columns)))
+    seconds = time.perf_counter() - start
+    sequences = sum(r[0] for r in results) if columns else 1
+    nodes = sum(r[1] for r in results)
+    positions = len(set().union(*(r[2] for r in results)))
+    return {
+        "depth": depth,
+        "sequences": sequences,
+        "nodes": nodes,
+        "positions": positions,
+        "dedupe_rate": 1 - positions / nodes if nodes else 0.0,
+        "seconds": round(seconds, 3),
+        "nps": round(nodes / seconds) if seconds > 0 else 0,
+    }
+
+# Function adds n to a counter or timer of the hot paths; callers check that STATS is not None first, so it is never called while off
+def count_stat(name: str, n = 1):
+    STATS[name] = STATS.get(name, 0) + n
+
+# Function turns the counters and timers of the hot paths on (clearing them) or off
+def enable_stats(on: bool = True):
+    global STATS
+    STATS = {} if on else None
+
+# Function returns a snapshot of the counters and timers of the hot paths, along with the rates derived from them, e.g., the cells
+# probed per find_winner call, the mean render time, and the share of search nodes cut off or found in the transposition table
+# The snapshot is empty while instrumentation is off; counts made in worker processes (e.g., by the mcts engine) are not included
+def stats():
+    if STATS is None: return {}
+    snapshot = dict(sorted(STATS.items()))
+    for name, n, d in (("find_winner.cells_per_call", "find_winner.cells", "find_winner.calls"), ("render.mean_seconds", "render.seconds", "render.calls"),
+                       ("solver.cutoff_rate", "solver.cutoffs", "solver.nodes"), ("solver.tt_hit_rate", "solver.tt_hits", "solver.tt_probes"),
+                       ("mcts.playouts_per_search", "mcts.playouts", "mcts.searches")):
+        if snapshot.get(d): snapshot[name] = snapshot.get(n, 0) / snapshot[d]
+    return snapshot
+
+# Function writes the snapshot of the counters and timers of the hot paths as JSON to standard error, or another file
+def dump_stats(out = None):
+    print(json.dumps(stats(), indent=2), file=out or sys.stderr)
+
+# Function returns the time in seconds a new Python process takes to import a module, and the names of all modules it imported
+# Times are the cumulative import times reported by python -X importtime, so interpreter startup itself is not counted
+def measure_import_time(module: str = "project"):
+    import subprocess
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=cwd, capture_output=True, text=True, check=True).stderr
+    seconds, modules = None, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2: continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit(): continue
+        modules.add(name.strip())
+        if name.strip() == module: seconds = int(cumulative) / 1e6
+    return seconds, modules
+
+# Engines checked by the differential fuzzer against the reference, i.e., a drop that scans every cell of a column from the bottom
+# up and the "scan" mode of find_winner on the grid backend: drop_chip on the grid backend (with its column height index), the
+# bitboard backend, the "lastmove" and "lines" modes of find_winner, the make_move fast path, and BatchBoard
+FUZZ_ENGINES = ("drop_chip", "bitboard", "lastmove", "lines", "make_move", "batch")
+
+# Function plays a sequence of columns on the reference and on every engine, checking after every column that each engine agrees
+# with the reference on whether the chip was dropped, the winner, and the position; the game ends at the first win
+# The reference finds the cell a chip drops into on its own, so a bug in the column heights kept by the game board is caught too
+# Columns may be out of range or full, which must be rejected the same way. The make_move fast path only plays the columns it
+# reports as legal, and has to take back every chip it played to the empty game board at the end
+# Function returns None if every engine agrees, or the first mismatch as a dict of the engine, the index of the column, and the
+# expected and actual results; an engine raising an exception is a mismatch too
+def fuzz_game(rows: int, cols: int, limit: int, columns: list, **kwargs):
+    engines = kwargs.get("engines") or FUZZ_ENGINES
+    ref = GameBoard(rows = rows, cols = cols, limit = limit)
+    boards = {
+        "grid": GameBoard(rows = rows, cols = cols, limit = limit) if {"drop_chip", "lastmove", "lines"} & set(engines) else None,
+        "bitboard": GameBoard(rows = rows, cols = cols, limit = limit, backend = "bitboard") if "bitboard" in engines else None,
+        "make_move": GameBoard(rows = rows, cols = cols, limit = limit, debug = True) if "make_move" in engines else None,
+        "batch": BatchBoard(1, rows = rows, cols = cols, limit = limit) if "batch" in engines else None,
+    }
+
+    # Function drops a chip on the reference in the lowest open cell of a column, scanning the cells from the bottom up, without
+    # the column height index, and returns whether the chip was dropped
+    def drop(c):
+        if not isinstance(c, int) or not 1 <= c <= ref.cols: return False
+        for r in range(1, ref.rows + 1):
+            if ref.get_player(c, r) is None:
+                ref.set_player(c, r, GameBoard.PLAYER_B if dropped % 2 else GameBoard.PLAYER_A)
+                return True
+        return False
+
+    # Function returns the player number of a winner, or 0 for none
+    def number(p):
+        return p[0] if p is not None else 0
+
+    # Function returns whether the column was played, the winning player number (0 for none), and the position of an engine
+    def play(engine, c):
+        if engine == "bitboard":
+            gb = boards[engine]
+            ok = drop_chip(gb, c)
+            return ok, number(find_winner(gb)) if ok else 0, gb.get_position()
+        if engine in ("drop_chip", "lastmove", "lines"):
+            gb = boards["grid"]
+            return grid, number(find_winner(gb, mode = "scan" if engine == "drop_chip" else engine)) if grid else 0, gb.get_position()
+        if engine == "make_move":
+            gb = boards[engine]
+            if c not in gb.legal_columns(): return False, 0, gb.get_position()
+            p = gb.next_turn()
+            gb.make_move(c)
+            return True, p[0] if gb.count_chains(p) else 0, gb.get_position()
+        batch = boards[engine]
+        ok = bool(batch.drop_chip([c])[0])
+        return ok, int(batch.winner[0]) if ok else 0, "/".join([ "".join([ str(p) if p else "." for p in batch.board[0, r] ]) for r in reversed(range(batch.rows)) ])
+
+    dropped = 0
+    for i, c in enumerate(columns):
+        ok = drop(c)
+        dropped += ok
+        winner = find_winner(ref, mode = "scan") if ok else None
+        expected = (ok, number(winner), ref.get_position())
+        try:
+            grid = drop_chip(boards["grid"], c) if boards["grid"] is not None else None
+        except Exception as e:
+            grid = repr(e)
+        for engine in engines:
+            try:
+                got = play(engine, c)
+            except Exception as e:
+                got = repr(e)
+            if got != expected: return {"engine": engine, "index": i, "expected": expected, "got": got}
+        if winner is not None: break
+
+    if "make_move" in engines:
+        gb, empty = boards["make_move"], GameBoard(rows = rows, cols = cols, limit = limit)
+        try:
+            while gb.moves: gb.unmake_move()
+            got = (gb.get_position(), gb.zobrist, gb.count_chains(GameBoard.PLAYER_A), gb.count_chains(GameBoard.PLAYER_B))
+        except Exception as e:
+            got = repr(e)
+        expected = (empty.get_position(), empty.zobrist, 0, 0)
+        if got != expected: return {"engine": "make_move", "index": len(columns), "expected": expected, "got": got}
+    return None
+
+# Function shrinks a sequence of columns on which an engine disagrees with the reference to a minimal one that still disagrees
+# The sequence is cut after the first mismatch, then columns are taken out one at a time for as long as the engine still disagrees
+def shrink_game(rows: int, cols: int, limit: int, columns: list, engine: str):
+    mismatch = fuzz_game(rows, cols, limit, columns, engines = (engine,))
+    if mismatch is None: return columns
+    columns = list(columns[:mismatch["index"] + 1])
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for i in range(len(columns)):
+            candidate = columns[:i] + columns[i+1:]
+            if fuzz_game(rows, cols, limit, candidate, engines = (engine,)) is not None:
+                columns, shrunk = candidate, True
+                break
+    return columns
+
+# Function returns a random game for the fuzzer, i.e., its rows, cols, limit, and columns, with a bias towards edge cases:
+# 1 row or column, the largest game boards, limits of 1, and limits the limit setter clamps (none, 0, negative, or too large)
+# A few columns are out of range, and there are twice as many columns as cells, so full columns are rejected too
+def fuzz_geometry(rng: random.Random):
+    rows = rng.choice((GameBoard.MIN_ROWS, GameBoard.MAX_ROWS)) if rng.random() < 0.25 else rng.randint(GameBoard.MIN_ROWS, GameBoard.MAX_ROWS)
+    cols = rng.choice((GameBoard.MIN_COLS, GameBoard.MAX_COLS)) if rng.random() < 0.25 else rng.randint(GameBoard.MIN_COLS, GameBoard.MAX_COLS)
+    limit = rng.choice((None, -1, 0, 1, GameBoard.MAX_ROWS + 1)) if rng.random() < 0.25 else rng.randint(1, max(rows, cols))
+    columns = [ rng.randint(-1, cols + 2) if rng.random() < 0.05 else rng.randint(1, cols) for _ in range(2 * rows * cols) ]
+    return rows, cols, limit, columns
+
+# Function fuzzes a number of random games with a random number generator seeded from its own seed, and returns their tally,
+# with every mismatch shrunk to a minimal sequence of columns; at most 10 mismatches are kept
+def fuzz_games(n: int, seed: int, **kwargs):
+    rng = random.Random(seed)
+    engines = kwargs.get("engines") or FUZZ_ENGINES
+    tally = {"games": 0, "moves": 0, "mismatches": []}
+    for _ in range(n):
+        rows, cols, limit, columns = fuzz_geometry(rng)
+        mismatch = fuzz_game(rows, cols, limit, columns, engines = engines)
+        tally["games"] += 1
+        tally["moves"] += len(columns) if mismatch is None else mismatch["index"] + 1
+        if mismatch is not None and len(tally["mismatches"]) < 10:
+            mismatch["columns"] = shrink_game(rows, cols, limit, columns, mismatch["engine"])
+            tally["mismatches"].append({"rows": rows, "cols": cols, "limit": limit, **mismatch})
+    return tally
+
+# Function adds the counts and mismatches of one fuzzer tally into another, and returns the latter
+def merge_fuzz(total: dict, tally: dict):
+    total["games"] += tally["games"]
+    total["moves"] += tally["moves"]
+    total["mismatches"].extend(tally["mismatches"])
+    return total
+
+# Function fuzzes n random games across all game board sizes and limits, spread across a pool of worker processes, checking every
+# engine in engines (all of FUZZ_ENGINES by default, BatchBoard only if numpy is installed) against the reference, and returns
+# the number of games and columns played and every mismatch found. As in simulate, games are split into seeded chunks, so the
+# games played for a seed do not depend on the number of workers; mismatches are sorted smallest first
+def fuzz(n: int, **kwargs):
+    workers = kwargs.get("workers") or os.cpu_count() or 1
+    seed = kwargs.get("seed")
+    if seed is None: seed = random.randrange(1 << 32)
+    engines = kwargs.get("engines")
+    if engines is None:
+        import importlib.util
+        engines = tuple(e for e in FUZZ_ENGINES if e != "batch" or importlib.util.find_spec("numpy") is not None)
+    chunk = max(1, kwargs.get("chunk") or 100)
+    chunks = [ (min(chunk, n - i), seed * 1000003 + i // chunk) for i in range(0, n, chunk) ]
+    start = time.perf_counter()
+    total = {"games": 0, "moves": 0, "mismatches": []}
+    if workers == 1:
+        for size, s in chunks:
+            merge_fuzz(total, fuzz_games(size, s, engines = engines))
+    else:
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            futures = [ executor.submit(fuzz_games, size, s, engines = engines) for size, s in chunks ]
+            for future in concurrent.futures.as_completed(futures):
+                merge_fuzz(total, future.result())
+    total["mismatches"].sort(key=lambda m: (len(m["columns"]), m["rows"] * m["cols"]))
+    return {"games": total["games"], "moves": total["moves"], "seed": seed, "engines": list(engines), "seconds": round(time.perf_counter() - start, 3), "mismatches": total["mismatches"]}
+
+# Board sizes and limits covered by the benchmarks, from the smallest to the largest game board, with limits from 1 up to 24
+# Limits that a game board scales down to the same effective limit are only benchmarked once, see run_benchmarks
+BENCH_GEOMETRIES = [ (rows, cols, limit) for rows in (1, 2, 6, 12, 24) for cols in (1, 2, 7, 10) for limit in (1, 4, 24) ]
+
+# Function returns a game board of the given size and limit with random moves played on it, with or without a winner
+# An "early" position has an eighth of the grid filled and a "late" position three quarters, and both have at least one move
+def bench_position(rows: int, cols: int, limit: int, phase: str, rng: random.Random, **kwargs):
+    gb = GameBoard(rows = rows, cols = cols, limit = limit, backend = kwargs.get("backend"))
+    for _ in range(max(1, rows * cols // 8 if phase == "early" else rows * cols * 3 // 4)):
+        drop_chip(gb, rng.choice(gb.legal_columns()))
+    return gb
+
+# Function returns the throughput and latency stats of a list of timings in nanoseconds: the number of timed calls, calls per
+# second, and the mean, median, and 99th percentile latencies in microseconds
+def bench_stats(samples: list):
+    samples = sorted(samples)
+    total = sum(samples) or 1
+    return {
+        "n": len(samples),
+        "ops": round(len(samples) * 1e9 / total, 1),
+        "mean_us": round(total / len(samples) / 1e3, 3),
+        "p50_us": round(samples[len(samples) // 2] / 1e3, 3),
+        "p99_us": round(samples[min(len(samples) - 1, len(samples) * 99 // 100)] / 1e3, 3),
+    }
+
+# Function times drop_chip, every mode of find_winner, get_chains, and GameBoard.__str__ on early and late positions of every
+# board size and limit in geometries, and full random games of each, and returns the stats of each as a dict keyed by a case name
+# such as "find_winner[scan] 6x7x4 late". Every case is timed over repeat calls (games over a tenth as many), one call at a time
+# drop_chip is timed on each column in turn, taking the chip back after every call, and __str__ right after a chip is dropped,
+# as in a game, with the screen clearing sent to nowhere. Optional arguments are the backend, the number of calls, and the seed
+def run_benchmarks(**kwargs):
+    import contextlib
+    rng = random.Random(kwargs.get("seed") or 0)
+    repeat = max(1, kwargs.get("repeat") or 200)
+    modes = ("scan", "lastmove", "lines") + (("bits",) if kwargs.get("backend") == "bitboard" else ())
+    results, seen = {}, set()
+    clock = time.perf_counter_ns
+    for geometry in kwargs.get("geometries") or BENCH_GEOMETRIES:
+        gb = GameBoard(rows = geometry[0], cols = geometry[1], limit = geometry[2])
+        if (gb.rows, gb.cols, gb.limit) in seen: continue
+        seen.add((gb.rows, gb.cols, gb.limit))
+        size = f"{gb.rows}x{gb.cols}x{gb.limit}"
+        for phase in ("early", "late"):
+            gb = bench_position(gb.rows, gb.cols, gb.limit, phase, rng, backend = kwargs.get("backend"))
+            samples = []
+            for i in range(repeat):
+                start = clock()
+                dropped = drop_chip(gb, i % gb.cols + 1)
+                samples.append(clock() - start)
+                if dropped: gb.pop_move()
+            results[f"drop_chip {size} {phase}"] = bench_stats(samples)
+            for mode in modes:
+                samples = []
+                for _ in range(repeat):
+                    start = clock()
+                    find_winner(gb, mode = mode)
+                    samples.append(clock() - start)
+                results[f"find_winner[{mode}] {size} {phase}"] = bench_stats(samples)
+            samples = []
+            for i in range(repeat):
+                c, r = i % gb.cols + 1, i // gb.cols % gb.rows + 1
+                start = clock()
+                get_chains(gb, c, r)
+                samples.append(clock() - start)
+            results[f"get_chains {size} {phase}"] = bench_stats(samples)
+            samples = []
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                for i in range(repeat):
+                    dropped = drop_chip(gb, i % gb.cols + 1)
+                    start = clock()
+                    str(gb)
+                    samples.append(clock() - start)
+                    if dropped: gb.pop_move()
+            results[f"__str__ {size} {phase}"] = bench_stats(samples)
+        samples = []
+        for _ in range(max(1, repeat // 10)):
+            gb = GameBoard(rows = gb.rows, cols = gb.cols, limit = gb.limit, backend = kwargs.get("backend"))
+            start = clock()
+            play_game(gb, (random_policy, random_policy), rng)
+            samples.append(clock() - start)
+        results[f"play_game {size}"] = bench_stats(samples)
+    return results
+
+# Function returns the cases of a benchmark run whose median latency is slower than in a baseline run by more than a tolerance
+# (a fraction, 0.25 by default) and by more than a floor (1 microsecond by default, below which timings are mostly noise),
+# as a dict of each case's median latencies before and after, and their ratio
+# Cases missing from either run are left out, so a baseline only needs to cover the cases that matter
+def compare_benchmarks(results: dict, baseline: dict, **kwargs):
+    tolerance = kwargs.get("tolerance", 0.25)
+    floor = kwargs.get("floor", 1.0)
+    regressions = {}
+    for case, stats in results.items():
+        if case not in baseline or not baseline[case]["p50_us"]: continue
+        ratio = stats["p50_us"] / baseline[case]["p50_us"]
+        if ratio > 1 + tolerance and stats["p50_us"] - baseline[case]["p50_us"] > floor: regressions[case] = {"baseline_us": baseline[case]["p50_us"], "p50_us": stats["p50_us"], "ratio": round(ratio, 2)}
+    return regressions
+
 # Main function instantiates the Connect-4 gameboard to default or user-specific grid and limit sizes parsed by argparse
 # Function emulates the bare minimum a person does to play Connect-4, i.e.:
 # 1. I will drop one of my chips in one of the columns on the game board
@@ -218,31 +2118,153 @@ def main():
     ap.add_argument("-r", help="Optional argument to set the number of rows on the game board. Values can range from 1 to 24. Default value is 6.", type=int)
     ap.add_argument("-c", help="Optional argument to set the number of columns on the game board. Values can range from 1 to 10. Default value is 7.", type=int)
     ap.add_argument("-l", help="Optional argument to set the number of chips to form a winning row, column, or diagonal. Values can be any whole greater than 1, but the game will automatically scale it down to the maximum of the nunmber of rows or columns to ensure that the game ensures a possible winner.", type=int)
+    ap.add_argument("--ai", help="Optional argument to let the computer play the second player using the given engine.", choices=["random", "negamax", "mcts"])
+    ap.add_argument("--think", help="Optional argument to set the number of seconds the computer may think per move. Default value is 1.", type=float, default=1.0)
+    ap.add_argument("--ponder", help="Optional argument to let the computer think in the background while waiting for a column to be typed in: about the best column to play, shown by typing ? instead, and about its reply to every column when playing the negamax engine.", action="store_true")
+    ap.add_argument("--cache", help="Optional argument to set the path of a database of solved positions for the negamax engine to reuse and add to.", metavar="PATH")
+    ap.add_argument("--book", help="Optional argument to set the path of an opening book for the computer to play from before searching, in games, --serve, --simulate, and --tournament.", metavar="PATH")
+    ap.add_argument("--build-book", help="Optional argument to build an opening book of every position up to --depth moves at the given path, scoring each position for up to --think seconds, and exit.", metavar="PATH")
+    ap.add_argument("--depth", help="Optional argument to set the number of moves covered by --build-book. Default value is 4.", type=int, default=4)
+    ap.add_argument("--render", help="Optional argument to set how the game board is redrawn on a terminal: full redraws the screen every turn, diff only redraws what changed. Default value is full.", choices=["full", "diff"], default="full")
+    ap.add_argument("--backend", help="Optional argument to set how the game board is stored in memory. Default value is grid.", choices=GameBoard.BACKENDS)
+    ap.add_argument("--headless", help="Optional argument to replay games from a file (or standard input if no file is given), one game per line of column numbers, and print the result of every game as a JSON line instead.", nargs="?", const="-", metavar="FILE")
+    ap.add_argument("--db", help="Optional argument to set the path of the game database used by --ingest and --query.", metavar="PATH", default="games.db")
+    ap.add_argument("--ingest", help="Optional argument to store the games of a file (or standard input if - is given), one game per line of column numbers, in the game database with every position they reached, print the number of games and positions as JSON, and exit.", metavar="FILE")
+    ap.add_argument("--query", help="Optional argument to look up the position reached by a sequence of columns (e.g., \"4 4 3\", or \"\" for the empty game board) in the game database, print the games that reached it, their win rates, and the columns played next as JSON, and exit.", metavar="MOVES")
+    ap.add_argument("--perft", help="Optional argument to count the move sequences and unique positions reachable in up to the given number of moves, print the counts and nodes per second as JSON, and exit.", type=int, metavar="N")
+    ap.add_argument("--import-time", help="Optional argument to print how long it takes to import this program, in milliseconds, and exit.", action="store_true")
+    ap.add_argument("--bench", help="Optional argument to time the hot paths of the game on boards of every size, calling each the given number of times (default 200), print the stats as JSON, and exit.", type=int, nargs="?", const=200, metavar="N")
+    ap.add_argument("--baseline", help="Optional argument to set the path of the JSON output of an earlier --bench run to compare with, exiting with status 1 if any case is more than 25%% and 1 microsecond slower.", metavar="PATH")
+    ap.add_argument("--stats", help="Optional argument to count calls, cells probed, render time, and search nodes on the hot paths, and print them as JSON to standard error at exit. Setting the CONNECK_STATS environment variable does the same.", action="store_true")
+    ap.add_argument("--serve", help="Optional argument to host games for any number of clients over a line-based protocol on the given TCP host:port or Unix socket path (default 127.0.0.1:4444), with the computer playing the second player if --ai is set.", nargs="?", const="127.0.0.1:4444", metavar="ADDRESS")
+    ap.add_argument("--load", help="Optional argument to play --games random games against a server at the given address from --clients concurrent connections, print the moves per second and move latencies as JSON, and exit.", metavar="ADDRESS")
+    ap.add_argument("--games", help="Optional argument to set the number of games played by --load, or the most games played by every pairing of --tournament. Default value is 100.", type=int, default=100)
+    ap.add_argument("--clients", help="Optional argument to set the number of concurrent connections of --load. Default value is 10.", type=int, default=10)
+    ap.add_argument("--tournament", help="Optional argument to play a round-robin tournament between the given agents (random, negamax, or mcts, optionally with a budget of nodes or playouts, e.g., negamax:5000), print the standings with Elo ratings as JSON lines as they come in, and exit.", nargs="+", metavar="AGENT")
+    ap.add_argument("--gauntlet", help="Optional argument to only play the first agent of --tournament against each of the others.", action="store_true")
+    ap.add_argument("--fuzz", help="Optional argument to play the given number of random games on boards of every size and limit, check that every fast engine agrees with the reference find_winner and drop_chip, print any mismatches shrunk to a minimal sequence of columns as JSON, and exit with status 1 if there are any.", type=int, metavar="N")
+    ap.add_argument("--simulate", help="Optional argument to play the given number of random self-play games instead, and print their stats as JSON.", type=int, metavar="N")
+    ap.add_argument("--workers", help="Optional argument to set the number of worker processes for --simulate, --fuzz, --tournament, --ingest, and the mcts engine. Default value is the number of CPUs.", type=int)
+    ap.add_argument("--seed", help="Optional argument to set the random seed for --simulate, --fuzz, --tournament, and --bench.", type=int)
     args = ap.parse_args()
 
-    gb = GameBoard(rows = args.r, cols = args.c, limit = args.l)
+    if args.stats and STATS is None: enable_stats()
+    if STATS is not None: atexit.register(dump_stats)
+
+    if args.perft is not None:
+        print(json.dumps(perft(GameBoard(rows = args.r, cols = args.c, limit = args.l, backend = args.backend), args.perft, workers = args.workers), indent=2))
+        return
+
+    if args.import_time:
+        print(f"{measure_import_time()[0] * 1000:.1f} ms")
+        return
+
+    if args.bench is not None:
+        report = {"backend": args.backend or GameBoard.DEFAULT_BACKEND, "repeat": args.bench, "results": run_benchmarks(backend = args.backend, repeat = args.bench, seed = args.seed)}
+        if args.baseline is not None:
+            with open(args.baseline) as f:
+                report["regressions"] = compare_benchmarks(report["results"], json.load(f)["results"])
+        print(json.dumps(report, indent=2))
+        if report.get("regressions"): sys.exit(1)
+        return
+
+    if args.build_book is not None:
+        print(f"{build_book(args.build_book, rows = args.r, cols = args.c, limit = args.l, depth = args.depth, think = args.think, workers = args.workers)} positions")
+        return
+
+    if args.ingest is not None or args.query is not None:
+        db = GameDatabase(args.db)
+        if args.ingest is not None:
+            with (open(args.ingest) if args.ingest != "-" else sys.stdin) as lines:
+                print(json.dumps(db.ingest(lines, rows = args.r, cols = args.c, limit = args.l, workers = args.workers), indent=2))
+        else:
+            gb = GameBoard(rows = args.r, cols = args.c, limit = args.l)
+            for c in args.query.replace(",", " ").split():
+                if not c.isdecimal() or not drop_chip(gb, int(c)): ap.error(f"illegal column {c} in --query")
+            print(json.dumps({**db.win_rate(gb), "continuations": db.continuations(gb), "games_sample": [ game["id"] for game in db.find_games(gb, limit = 10) ]}, indent=2))
+        db.close()
+        return
+
+    if args.headless is not None:
+        with (open(args.headless) if args.headless != "-" else sys.stdin) as lines:
+            for result in headless(lines, rows = args.r, cols = args.c, limit = args.l, backend = args.backend):
+                sys.stdout.write(json.dumps(result) + "\n")
+        return
+
+    if args.serve is not None or args.load is not None:
+        import asyncio
+        try:
+            if args.serve is not None:
+                asyncio.run(GameServer(rows = args.r, cols = args.c, limit = args.l, backend = args.backend, ai = args.ai, think = args.think, book = args.book, workers = args.workers).serve(args.serve))
+            else:
+                print(json.dumps(asyncio.run(load_test(args.load, games = args.games, clients = args.clients, rows = args.r, cols = args.c, limit = args.l, seed = args.seed)), indent=2))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.tournament is not None:
+        for standings in tournament(args.tournament, gauntlet = args.gauntlet, games = args.games, book = args.book, rows = args.r, cols = args.c, limit = args.l, workers = args.workers, seed = args.seed):
+            print(json.dumps(standings), flush=True)
+        return
+
+    if args.fuzz is not None:
+        report = fuzz(args.fuzz, workers = args.workers, seed = args.seed)
+        print(json.dumps(report, indent=2))
+        if report["mismatches"]: sys.exit(1)
+        return
+
+    if args.simulate is not None:
+        print(json.dumps(simulate(args.simulate, rows = args.r, cols = args.c, limit = args.l, backend = args.backend, book = args.book, workers = args.workers, seed = args.seed), indent=2))
+        return
+
+    gb = GameBoard(rows = args.r, cols = args.c, limit = args.l, backend = args.backend)
+    book = OpeningBook(args.book) if args.book else None
+    engine = MCTS(workers = args.workers) if args.ai == "mcts" else Solver(cache = PositionCache(args.cache) if args.cache else None) if args.ai == "negamax" else None
+    renderer = TerminalRenderer(gb) if args.render == "diff" and sys.stdout.isatty() else None
+    ponderer = Ponderer(engine = engine if isinstance(engine, Solver) else None, think = args.think, replies = args.ai == "negamax", book = book) if args.ponder else None
+    hint = ""
     winner = None
     error = False
     while True:
         try:
-            # Render the game board in its current state
-            print(gb)
+            # Render the game board in its current state, either in full, or only what changed along with the prompt
+            prompt = f"--- Turn {len(gb.moves)+1} ---\n\n{hint}Drop {gb.draw_player(gb.next_turn())} in: "
+            hint = ""
+            if renderer is not None:
+                renderer.update(prompt)
+                prompt = ""
+            else:
+                print(gb)
 
-            # Get the column number from the user, and drop a chip in that column
-            if not drop_chip(gb, int(input(f"--- Turn {len(gb.moves)+1} ---\n\nDrop {gb.draw_player(gb.next_turn())} in: "))): continue
+            # Get the column number from the computer or the user, and drop a chip in that column
+            # While the user thinks, the computer may ponder the user's best column, which "?" shows, and its replies to every column
+            if args.ai is not None and gb.next_turn() == GameBoard.PLAYER_B:
+                c = ponderer.reply(gb) if ponderer is not None else None
+                if c is None: c = choose_move(gb, ai = args.ai, think = args.think, engine = engine, book = book)
+            else:
+                if ponderer is not None: ponderer.start(gb)
+                s = input(prompt)
+                if s.strip() == "?":
+                    hint = f"Hint: drop {gb.draw_player(gb.next_turn())} in {ponderer.hint() if ponderer is not None else choose_move(gb, think = args.think)}\n\n"
+                    continue
+                c = int(s)
+            if not drop_chip(gb, c): continue
 
             # Check if I won, but only after enough moves have been made for any player to have formed a winning row, column, or diagonal
             if (len(gb.moves) >= gb.limit * 2 - 1):
-                winner = find_winner(gb)
+                winner = find_winner(gb, mode = "lastmove")
 
-            # If I am the winner, or if I have reached the maximum plays allowed by the grid, exit the game
-            if winner is not None or (len(gb.moves) == gb.rows * gb.cols): break
+            # If I am the winner, or if no player can win anymore (at the latest once the grid is full), exit the game
+            if winner is not None or gb.is_draw(): break
 
         except Exception as e:
             # Something went wrong but not implementing boundary cases on key inputs
             error = False
             continue
 
+    if ponderer is not None: ponderer.stop()
+    if isinstance(engine, MCTS): engine.close()
+
     # Render the game board in its final state
     print(gb)
 
@@ -510,3 +510,954 @@ def test_find_winner_3x3_limit_3_win_diag_bkwd_end():
     p = gb.next_turn()
     assert project.drop_chip(gb, 3)
     assert project.find_winner(gb) == p
+
+def test_init_backend_bitboard():
+    gb = GameBoard(backend = "bitboard")
+    assert gb.backend == "bitboard"
+    assert gb.masks == (0, 0)
+    assert gb.heights == (0, 0, 0, 0, 0, 0, 0)
+    assert len(gb.board) == 6
+
+def test_init_backend_invalid():
+    gb = GameBoard(backend = "abacus")
+    assert gb.backend == "grid"
+    assert gb.masks is None
+
+def test_bitboard_drop_three_chips_c1c1c2():
+    gb = GameBoard(backend = "bitboard")
+    assert project.drop_chip(gb, 1)
+    assert project.drop_chip(gb, 1)
+    assert project.drop_chip(gb, 2)
+    assert gb.get_player(1, 1) == gb.PLAYER_A
+    assert gb.get_player(1, 2) == gb.PLAYER_B
+    assert gb.get_player(2, 1) == gb.PLAYER_A
+    assert gb.get_player(2, 2) is None
+    assert gb.heights[:2] == (2, 1)
+    assert gb.board[1][:2] == [gb.PLAYER_A, gb.PLAYER_A]
+
+def test_bitboard_drop_one_chip_c1_column_already_full():
+    gb = GameBoard(backend = "bitboard")
+    for _ in range(6):
+        assert project.drop_chip(gb, 1)
+    assert not project.drop_chip(gb, 1)
+    assert len(gb.moves) == 6
+
+def test_bitboard_find_winner_24x10_limit_24_win_col():
+    gb = GameBoard(rows = 24, cols = 10, limit = 24, backend = "bitboard")
+    for _ in range(23):
+        assert project.drop_chip(gb, 1)
+        assert project.drop_chip(gb, 2)
+    p = gb.next_turn()
+    assert project.drop_chip(gb, 1)
+    assert project.find_winner(gb) == p
+
+def test_bitboard_find_winner_no_wrap_across_columns():
+    gb = GameBoard(rows = 3, cols = 3, limit = 3, backend = "bitboard")
+    for c in (1, 2, 1, 3, 1):
+        assert project.drop_chip(gb, c)
+    assert project.find_winner(gb) == gb.PLAYER_A
+    gb = GameBoard(rows = 3, cols = 3, limit = 3, backend = "bitboard")
+    for c in (1, 1, 1, 2, 2, 3, 2, 3):
+        assert project.drop_chip(gb, c)
+    assert project.find_winner(gb) is None
+
+def test_bitboard_find_winner_matches_grid():
+    rng = project.random.Random(7)
+    for _ in range(200):
+        rows, cols = rng.randint(1, 24), rng.randint(1, 10)
+        limit = rng.randint(1, 24)
+        grid = GameBoard(rows = rows, cols = cols, limit = limit)
+        bits = GameBoard(rows = rows, cols = cols, limit = limit, backend = "bitboard")
+        while len(grid.moves) < rows * cols:
+            c = rng.randint(1, cols)
+            assert project.drop_chip(grid, c) == project.drop_chip(bits, c)
+            if not grid.moves: continue
+            winner = project.find_winner(grid)
+            assert project.find_winner(bits) == winner
+            if winner is not None: break
+        assert grid.board == bits.board
+
+def test_count_chain_row():
+    gb = GameBoard()
+    for c in (1, 1, 2, 2, 3):
+        assert project.drop_chip(gb, c)
+    assert project.count_chain(gb, 1, 1, 1, 0) == 2
+    assert project.count_chain(gb, 3, 1, -1, 0) == 2
+    assert project.count_chain(gb, 3, 1, 0, 1) == 0
+    assert project.count_chain(gb, 4, 1, -1, 0) == 0
+
+def test_find_winner_lastmove_3x3_limit_3_win_diag_bkwd_middle():
+    gb = GameBoard(rows = 3, cols = 3, limit = 3)
+    for c in (3, 2, 1, 1, 1, 3):
+        assert project.drop_chip(gb, c)
+    p = gb.next_turn()
+    assert project.drop_chip(gb, 2)
+    assert project.find_winner(gb, mode = "lastmove") == p
+
+def test_find_winner_lastmove_matches_scan():
+    rng = project.random.Random(11)
+    for _ in range(100):
+        rows, cols = rng.randint(1, 24), rng.randint(1, 10)
+        gb = GameBoard(rows = rows, cols = cols, limit = rng.randint(1, 24), backend = rng.choice(GameBoard.BACKENDS))
+        while len(gb.moves) < rows * cols:
+            if not project.drop_chip(gb, rng.randint(1, cols)): continue
+            winner = project.find_winner(gb, mode = "scan")
+            assert project.find_winner(gb, mode = "lastmove") == winner
+            if winner is not None: break
+
+def test_column_height():
+    gb = GameBoard()
+    assert gb.column_height(1) == 0
+    assert project.drop_chip(gb, 1)
+    assert project.drop_chip(gb, 1)
+    assert gb.column_height(1) == 2
+    assert gb.column_height(2) == 0
+    assert gb.column_height(0) is None
+    assert gb.column_height(8) is None
+
+def test_column_height_set_player_gap():
+    gb = GameBoard()
+    gb.set_player(1, 2, gb.PLAYER_A)
+    assert gb.column_height(1) == 0
+    assert project.drop_chip(gb, 1, p = gb.PLAYER_B)
+    assert gb.get_player(1, 1) == gb.PLAYER_B
+    assert gb.column_height(1) == 2
+
+def test_is_column_full():
+    gb = GameBoard(rows = 2, cols = 2)
+    assert not gb.is_column_full(1)
+    assert project.drop_chip(gb, 1)
+    assert project.drop_chip(gb, 1)
+    assert gb.is_column_full(1)
+    assert not gb.is_column_full(2)
+
+def test_legal_columns():
+    gb = GameBoard(rows = 1, cols = 3, limit = 3)
+    assert gb.legal_columns() == [1, 2, 3]
+    assert project.drop_chip(gb, 2)
+    assert gb.legal_columns() == [1, 3]
+    assert project.drop_chip(gb, 1)
+    assert project.drop_chip(gb, 3)
+    assert gb.legal_columns() == []
+
+def test_zobrist_incremental():
+    gb = GameBoard()
+    assert gb.zobrist == 0
+    assert project.drop_chip(gb, 4)
+    assert project.drop_chip(gb, 3)
+    h = gb.zobrist
+    assert h == gb.get_key(4, 1, gb.PLAYER_A) ^ gb.get_key(3, 1, gb.PLAYER_B)
+    assert project.drop_chip(gb, 5)
+    assert gb.pop_move() == {"c": 5, "r": 1, "player": gb.PLAYER_A}
+    assert gb.zobrist == h
+    assert gb.column_height(5) == 0
+
+def test_zobrist_transposition():
+    gb1, gb2 = GameBoard(), GameBoard()
+    for c in (1, 2, 3, 4):
+        assert project.drop_chip(gb1, c)
+    for c in (3, 4, 1, 2):
+        assert project.drop_chip(gb2, c)
+    assert gb1.zobrist == gb2.zobrist
+
+def test_copy():
+    gb = GameBoard(rows = 4, cols = 5, limit = 3, backend = "bitboard")
+    for c in (1, 2, 2):
+        assert project.drop_chip(gb, c)
+    gb2 = gb.copy()
+    assert gb2.board == gb.board
+    assert gb2.zobrist == gb.zobrist
+    assert project.drop_chip(gb2, 5)
+    assert len(gb.moves) == 3
+
+def test_solver_2x2_limit_2_first_player_wins():
+    result = project.Solver().solve(GameBoard(rows = 2, cols = 2, limit = 2))
+    assert result["solved"]
+    assert result["score"] == project.Solver.MATE - 3
+    assert result["distance"] == 3
+
+def test_solver_immediate_win():
+    gb = GameBoard()
+    for c in (1, 1, 2, 2, 3, 3):
+        assert project.drop_chip(gb, c)
+    result = project.Solver().solve(gb)
+    assert result["c"] == 4
+    assert result["distance"] == 1
+
+def test_solver_forced_loss():
+    gb = GameBoard()
+    for c in (4, 4, 3, 3, 2):
+        assert project.drop_chip(gb, c)
+    result = project.Solver().solve(gb)
+    assert result["score"] < 0
+    assert result["distance"] == 2
+
+def test_solver_block():
+    gb = GameBoard()
+    for c in (1, 7, 1, 7, 1):
+        assert project.drop_chip(gb, c)
+    assert project.Solver().solve(gb, time = 0.5)["c"] == 1
+
+def test_solver_node_budget():
+    result = project.Solver().solve(GameBoard(), nodes = 2000)
+    assert not result["solved"]
+    assert result["c"] in range(1, 8)
+
+def test_play_game_policies():
+    gb = GameBoard(rows = 3, cols = 3, limit = 3)
+    first = lambda gb, rng: 1 if not gb.is_column_full(1) else gb.legal_columns()[0]
+    second = lambda gb, rng: 3
+    assert project.play_game(gb, (first, second), project.random.Random(0)) == (1, 5)
+
+def test_simulate_stats():
+    stats = project.simulate(300, rows = 4, cols = 4, limit = 3, workers = 1, seed = 5)
+    assert stats["games"] == 300
+    assert abs(sum(stats["win_rate"].values()) + stats["draw_rate"] - 1) < 1e-9
+    assert sum(stats["lengths"].values()) == 300
+    assert all(5 <= n <= 16 for n in stats["lengths"])
+    assert sum(t["games"] for t in stats["first_move"].values()) == 300
+    assert abs(stats["first_move_advantage"] - (stats["win_rate"][1] - stats["win_rate"][2])) < 1e-9
+
+def test_simulate_reproducible_across_workers():
+    a = project.simulate(250, workers = 1, seed = 9, chunk = 100)
+    b = project.simulate(250, workers = 2, seed = 9, chunk = 100)
+    assert a["lengths"] == b["lengths"]
+    assert a["win_rate"] == b["win_rate"]
+    assert a["first_move"] == b["first_move"]
+
+def test_batch_board_drop_chip():
+    pytest.importorskip("numpy")
+    bb = project.BatchBoard(3, rows = 2, cols = 2, limit = 2)
+    assert list(bb.drop_chip([1, 2, 3])) == [True, True, False]
+    assert list(bb.drop_chip([1, 1, 1])) == [True, True, True]
+    assert list(bb.drop_chip([1, 0, 1])) == [False, False, True]
+    assert bb.board[0, :, 0].tolist() == [1, 2]
+    assert bb.board[1, :, 1].tolist() == [1, 0]
+    assert bb.heights.tolist() == [[2, 0], [1, 1], [2, 0]]
+    assert bb.moves.tolist() == [2, 2, 2]
+
+def test_batch_board_find_winner_2x2_limit_2():
+    pytest.importorskip("numpy")
+    bb = project.BatchBoard(3, rows = 2, cols = 2, limit = 2)
+    for c in ([1, 1, 1], [1, 2, 2], [2, 1, 2]):
+        bb.drop_chip(c)
+    assert bb.winner.tolist() == [1, 1, 1]
+    assert bb.done.all()
+    assert not bb.drop_chip([2, 2, 1]).any()
+
+def test_batch_board_matches_gameboard():
+    pytest.importorskip("numpy")
+    rng = project.random.Random(3)
+    for _ in range(30):
+        rows, cols, limit = rng.randint(1, 24), rng.randint(1, 10), rng.randint(1, 24)
+        boards = [ GameBoard(rows = rows, cols = cols, limit = limit) for _ in range(8) ]
+        winners = [0] * 8
+        bb = project.BatchBoard(8, rows = rows, cols = cols, limit = limit)
+        while not bb.done.all():
+            c = [ rng.randint(1, cols) for _ in range(8) ]
+            ok = bb.drop_chip(c)
+            for i, gb in enumerate(boards):
+                if winners[i] or not gb.legal_columns():
+                    assert not ok[i]
+                    continue
+                assert project.drop_chip(gb, c[i]) == ok[i]
+                if ok[i] and project.find_winner(gb, mode = "lastmove"): winners[i] = gb.get_lastmove()["player"][0]
+        assert bb.winner.tolist() == winners
+
+def test_batch_board_rollout_from_position():
+    np = pytest.importorskip("numpy")
+    gb = GameBoard()
+    for c in (1, 1, 2, 2, 3, 3):
+        assert project.drop_chip(gb, c)
+    bb = project.BatchBoard(50, gb = gb)
+    assert bb.next_turn().tolist() == [1] * 50
+    winners = bb.rollout(np.random.default_rng(0))
+    assert bb.done.all()
+    assert set(winners.tolist()) <= {0, 1, 2}
+    assert (bb.heights.sum(axis=1) == bb.moves).all()
+
+def test_get_lines_6x7_limit_4():
+    lines, cell_lines = project.get_lines(6, 7, 4)
+    assert len(lines) == 69
+    assert all(len(line) == 4 for line in lines)
+    assert len(cell_lines[(1-1) * 6 + 1-1]) == 3
+    assert len(cell_lines[(4-1) * 6 + 3-1]) == 13
+
+def test_get_lines_limit_1():
+    lines, cell_lines = project.get_lines(2, 3, 1)
+    assert len(lines) == 6
+    assert all(len(l) == 1 for l in cell_lines)
+
+def test_count_threats():
+    gb = GameBoard()
+    for c in (1, 7, 2, 7):
+        assert project.drop_chip(gb, c)
+    assert gb.count_threats(gb.PLAYER_A) == 0
+    assert project.drop_chip(gb, 3)
+    assert gb.count_threats(gb.PLAYER_A) == 1
+    assert gb.count_threats(gb.PLAYER_B) == 0
+    assert project.drop_chip(gb, 4)
+    assert gb.count_threats(gb.PLAYER_A) == 0
+    assert gb.count_chains(gb.PLAYER_A) == 0
+    gb.pop_move()
+    assert gb.count_threats(gb.PLAYER_A) == 1
+
+def test_find_winner_lines_matches_scan():
+    rng = project.random.Random(13)
+    for _ in range(100):
+        rows, cols = rng.randint(1, 24), rng.randint(1, 10)
+        gb = GameBoard(rows = rows, cols = cols, limit = rng.randint(1, 24), backend = rng.choice(GameBoard.BACKENDS))
+        while gb.legal_columns():
+            assert project.drop_chip(gb, rng.choice(gb.legal_columns()))
+            winner = project.find_winner(gb, mode = "scan")
+            assert project.find_winner(gb, mode = "lines") == winner
+            assert (gb.count_chains(gb.get_lastmove()["player"]) > 0) == (winner is not None)
+            if winner is not None: break
+
+def test_limit_change_rebuilds_lines():
+    gb = GameBoard()
+    for c in (1, 1, 2, 2, 3):
+        assert project.drop_chip(gb, c)
+    assert gb.count_chains(gb.PLAYER_A) == 0
+    gb.limit = 3
+    assert gb.count_chains(gb.PLAYER_A) == 1
+
+def test_render():
+    gb = GameBoard(rows = 2, cols = 3, limit = 2)
+    a, b, empty = gb.draw_player(gb.PLAYER_A), gb.draw_player(gb.PLAYER_B), project.draw_glyph(":white_circle:")
+    assert project.drop_chip(gb, 2)
+    assert gb.render().endswith(f"{empty * 3}\n{empty}{a}{empty}\n")
+    assert project.drop_chip(gb, 2)
+    assert project.drop_chip(gb, 3)
+    assert gb.render().endswith(f"{empty}{b}{empty}\n{empty}{a}{a}\n")
+    gb.pop_move()
+    assert gb.render().endswith(f"{empty}{b}{empty}\n{empty}{a}{empty}\n")
+
+def test_render_header():
+    gb = GameBoard(rows = 1, cols = 2, limit = 2, backend = "bitboard")
+    assert gb.render().startswith("-- Connect 2 --\n\n" + project.draw_header(2))
+    assert project.draw_header(2).count("\n") == 2
+
+def test_str_matches_render():
+    gb = GameBoard(backend = "bitboard")
+    for c in (4, 4, 3, 5):
+        assert project.drop_chip(gb, c)
+    assert str(gb) == gb.render()
+
+def test_terminal_renderer_update():
+    import io
+    gb = GameBoard(rows = 3, cols = 3, limit = 3)
+    out = io.StringIO()
+    renderer = project.TerminalRenderer(gb, out = out)
+    renderer.update("Drop: ")
+    assert out.getvalue() == "\033[H\033[2J" + gb.render() + "\nDrop: "
+    assert project.drop_chip(gb, 2)
+    assert project.drop_chip(gb, 2)
+    out.seek(0)
+    out.truncate()
+    renderer.update("Next: ")
+    a, b = gb.draw_player(gb.PLAYER_A), gb.draw_player(gb.PLAYER_B)
+    assert out.getvalue() == f"\033[7;3H{a}\033[6;3H{b}\033[9;1H\033[JNext: "
+
+def test_terminal_renderer_redraw_after_pop_move():
+    import io
+    gb = GameBoard()
+    out = io.StringIO()
+    renderer = project.TerminalRenderer(gb, out = out)
+    assert project.drop_chip(gb, 1)
+    renderer.update()
+    gb.pop_move()
+    out.seek(0)
+    out.truncate()
+    renderer.update()
+    assert out.getvalue().startswith("\033[H\033[2J")
+
+def test_terminal_renderer_redraw_when_board_does_not_fit(monkeypatch):
+    import io, os
+    monkeypatch.setattr(project.shutil, "get_terminal_size", lambda: os.terminal_size((80, 12)))
+    gb = GameBoard(rows = 6, cols = 7, limit = 4)
+    out = io.StringIO()
+    renderer = project.TerminalRenderer(gb, out = out)
+    renderer.update()
+    assert project.drop_chip(gb, 1)
+    out.seek(0)
+    out.truncate()
+    renderer.update("Next: ")
+    assert out.getvalue() == "\033[H\033[2J" + gb.render() + "\nNext: "
+
+def test_get_position():
+    gb = GameBoard(rows = 3, cols = 3, limit = 3)
+    for c in (2, 2, 3):
+        assert project.drop_chip(gb, c)
+    assert gb.get_position() == ".../.2./.11"
+
+def test_replay_game_win():
+    result = project.replay_game([4, 4, 3, 3, 2, 2, 1, 1])
+    assert result["result"] == "1"
+    assert result["winner"] == 1
+    assert result["win_index"] == 6
+    assert result["moves"] == 7
+
+def test_replay_game_draw():
+    result = project.replay_game(["1", "2", "2", "1"], rows = 2, cols = 2, limit = 2)
+    assert result["result"] == "1"
+    assert result["win_index"] == 2
+    result = project.replay_game([1, 2, 3], rows = 1, cols = 3, limit = 3)
+    assert result["result"] == "draw"
+
+def test_replay_game_illegal():
+    assert project.replay_game([1, 8])["error_index"] == 1
+    assert project.replay_game(["one"])["result"] == "illegal"
+    result = project.replay_game([1] * 7)
+    assert result["result"] == "illegal"
+    assert result["error_index"] == 6
+    assert result["moves"] == 6
+
+def test_headless():
+    results = list(project.headless(["4 4 3 3 2 2 1\n", "\n", "# skipped\n", "4,4\n"]))
+    assert [ r["game"] for r in results ] == [1, 4]
+    assert results[0]["winner"] == 1
+    assert results[1]["result"] == "open"
+    assert results[1]["position"].endswith("/...2.../...1...")
+
+def test_headless_non_decimal_digits(tmp_path):
+    results = list(project.headless(["1 \u00b2\n", "4 4\n"]))
+    assert results[0]["result"] == "illegal" and results[0]["error_index"] == 1
+    assert results[1]["result"] == "open"
+    db = project.GameDatabase(str(tmp_path / "games.db"))
+    assert db.ingest(["1 \u00b2", "4 4"], workers = 1)["rejected"] == 1
+    db.close()
+
+def test_import_time_budget():
+    seconds, modules = project.measure_import_time()
+    assert seconds < 0.25
+    assert not {"emoji", "inflect", "numpy", "concurrent.futures"} & modules
+
+def test_slots():
+    gb = GameBoard()
+    assert not hasattr(gb, "__dict__")
+    with pytest.raises(AttributeError):
+        gb.extra = 1
+
+def test_moves_view():
+    gb = GameBoard(rows = 24, cols = 10)
+    for c in (10, 10, 1):
+        assert project.drop_chip(gb, c)
+    assert len(gb.moves) == 3
+    assert gb.moves[0] == {"c": 10, "r": 1, "player": gb.PLAYER_A}
+    assert gb.moves[1::2] == [{"c": 10, "r": 2, "player": gb.PLAYER_B}]
+    assert gb.moves == [{"c": 10, "r": 1, "player": gb.PLAYER_A}, {"c": 10, "r": 2, "player": gb.PLAYER_B}, {"c": 1, "r": 1, "player": gb.PLAYER_A}]
+    assert [ m["c"] for m in gb.moves ] == [10, 10, 1]
+    assert gb.get_lastmove() == {"c": 1, "r": 1, "player": gb.PLAYER_A}
+
+def test_moves_log_two_bytes_per_move():
+    gb = GameBoard(rows = 24, cols = 10, backend = "bitboard")
+    for c in range(1, 11):
+        assert project.drop_chip(gb, c)
+    assert gb.moves._log.itemsize == 2
+    assert len(gb.moves._log) == 10
+
+def test_make_move_unmake_move():
+    gb = GameBoard(backend = "bitboard")
+    ref = GameBoard(backend = "bitboard")
+    for c in (4, 4, 3, 5, 3):
+        gb.make_move(c)
+        assert project.drop_chip(ref, c)
+    assert gb.board == ref.board
+    assert gb.zobrist == ref.zobrist
+    assert gb.heights == ref.heights
+    assert gb.moves == ref.moves
+    assert gb.count_threats(gb.PLAYER_A) == ref.count_threats(ref.PLAYER_A)
+    for _ in range(5):
+        gb.unmake_move()
+    assert gb.zobrist == 0
+    assert gb.heights == (0,) * 7
+    assert len(gb.moves) == 0
+    assert gb.masks == (0, 0)
+    assert gb.count_threats(gb.PLAYER_A) == 0
+
+def test_make_move_matches_drop_chip_random():
+    rng = project.random.Random(17)
+    for _ in range(50):
+        rows, cols, limit = rng.randint(1, 24), rng.randint(1, 10), rng.randint(1, 24)
+        gb = GameBoard(rows = rows, cols = cols, limit = limit, backend = rng.choice(GameBoard.BACKENDS), debug = True)
+        ref = gb.copy()
+        while gb.legal_columns():
+            c = rng.choice(gb.legal_columns())
+            gb.make_move(c)
+            assert project.drop_chip(ref, c)
+            if rng.random() < 0.3:
+                gb.unmake_move()
+                ref.pop_move()
+            assert gb.zobrist == ref.zobrist
+            assert gb.count_chains(gb.PLAYER_A) == ref.count_chains(ref.PLAYER_A)
+            assert gb.count_threats(gb.PLAYER_B) == ref.count_threats(ref.PLAYER_B)
+        assert gb.board == ref.board
+
+def test_make_move_debug():
+    gb = GameBoard(rows = 1, cols = 2, limit = 2, debug = True)
+    gb.make_move(1)
+    with pytest.raises(ValueError):
+        gb.make_move(1)
+    with pytest.raises(ValueError):
+        gb.make_move(3)
+    gb.unmake_move()
+    with pytest.raises(ValueError):
+        gb.unmake_move()
+
+def test_mcts_immediate_win():
+    gb = GameBoard()
+    for c in (1, 1, 2, 2, 3, 3):
+        assert project.drop_chip(gb, c)
+    result = project.MCTS(workers = 1, seed = 1).search(gb, playouts = 500)
+    assert result["c"] == 4
+    assert result["playouts"] == 500
+    assert sum(result["visits"].values()) == 500
+
+def test_mcts_block():
+    gb = GameBoard()
+    for c in (1, 7, 1, 7, 1):
+        assert project.drop_chip(gb, c)
+    assert project.MCTS(workers = 1, seed = 2).search(gb, playouts = 2000)["c"] == 1
+
+def test_mcts_root_parallel():
+    gb = GameBoard(rows = 4, cols = 4, limit = 3)
+    mcts = project.MCTS(workers = 2, seed = 3)
+    try:
+        result = mcts.search(gb, playouts = 301)
+    finally:
+        mcts.close()
+    assert result["playouts"] == 301
+    assert sum(result["visits"].values()) == 301
+    assert result["c"] in range(1, 5)
+
+def test_mcts_playouts_leave_board_unchanged():
+    gb = GameBoard(backend = "bitboard")
+    assert project.drop_chip(gb, 4)
+    before = (gb.board, gb.zobrist, len(gb.moves))
+    project.mcts_playouts(gb, playouts = 50, seed = 4)
+    assert (gb.board, gb.zobrist, len(gb.moves)) == before
+
+def test_mcts_playouts_time_none():
+    result = project.mcts_playouts(GameBoard(rows = 2, cols = 2, limit = 2), time = None, seed = 1)
+    assert result["playouts"] > 0 and set(result["children"]) == {1, 2}
+
+def test_get_canonical_key_mirror():
+    gb1, gb2 = GameBoard(), GameBoard()
+    for c in (1, 2, 2):
+        assert project.drop_chip(gb1, c)
+    for c in (7, 6, 6):
+        assert project.drop_chip(gb2, c)
+    key1, mirrored1 = gb1.get_canonical_key()
+    key2, mirrored2 = gb2.get_canonical_key()
+    assert key1 == key2
+    assert mirrored1 != mirrored2
+    assert key1.startswith("6x7x4:")
+
+def test_position_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = project.PositionCache(path, capacity = 1)
+    gb = GameBoard()
+    for c in (1, 1, 2, 2, 3, 3):
+        assert project.drop_chip(gb, c)
+    assert cache.get(gb) is None
+    cache.put(gb, {"c": 4, "score": 9999, "distance": 1})
+    mirror = GameBoard()
+    for c in (7, 7, 6, 6, 5, 5):
+        assert project.drop_chip(mirror, c)
+    assert cache.get(gb) == {"c": 4, "score": 9999, "distance": 1}
+    assert cache.get(mirror) == {"c": 4, "score": 9999, "distance": 1}
+    assert len(cache) == 1
+    cache.close()
+    reader = project.PositionCache(path, readonly = True)
+    assert reader.get(mirror)["c"] == 4
+    reader.close()
+
+def test_solver_cache(tmp_path):
+    cache = project.PositionCache(str(tmp_path / "cache.db"))
+    solver = project.Solver(cache = cache)
+    gb = GameBoard(rows = 4, cols = 4, limit = 3)
+    result = solver.solve(gb)
+    assert result["solved"]
+    assert result["nodes"] > 0
+    cached = project.Solver(cache = cache).solve(gb)
+    assert cached["nodes"] == 0
+    assert (cached["c"], cached["score"], cached["distance"]) == (result["c"], result["score"], result["distance"])
+    cache.close()
+
+def test_enumerate_positions():
+    boards = project.enumerate_positions(GameBoard(rows = 2, cols = 2, limit = 2), 1)
+    assert len(boards) == 2
+    assert sorted(len(gb.moves) for gb in boards) == [0, 1]
+    boards = project.enumerate_positions(GameBoard(), 2)
+    assert len(boards) == 1 + 4 + 25
+
+def test_opening_book(tmp_path):
+    path = str(tmp_path / "book.bin")
+    n = project.build_book(path, rows = 3, cols = 4, limit = 3, depth = 3, think = None, workers = 1)
+    book = project.OpeningBook(path)
+    assert len(book) == n
+    assert (book.rows, book.cols, book.limit, book.depth) == (3, 4, 3, 3)
+    gb = GameBoard(rows = 3, cols = 4, limit = 3)
+    solved = project.Solver().solve(gb)
+    assert book.lookup(gb)["score"] == solved["score"]
+    assert book.lookup(gb)["distance"] == solved["distance"]
+    for c in (1, 2):
+        assert project.drop_chip(gb, c)
+    mirror = GameBoard(rows = 3, cols = 4, limit = 3)
+    for c in (4, 3):
+        assert project.drop_chip(mirror, c)
+    entry, mirrored = book.lookup(gb), book.lookup(mirror)
+    assert entry["score"] == mirrored["score"]
+    assert entry["c"] == 5 - mirrored["c"]
+    assert project.choose_move(gb, book = book) == entry["c"]
+    assert book.lookup(GameBoard()) is None
+    book.close()
+
+def test_perft_6x7_limit_4():
+    result = project.perft(GameBoard(), 4, workers = 1)
+    assert result["sequences"] == 7 ** 4
+    assert result["nodes"] == 7 + 7 ** 2 + 7 ** 3 + 7 ** 4
+    assert result["positions"] == 7 + 49 + 238 + 1120
+    assert 0 < result["dedupe_rate"] < 1
+
+def test_perft_stops_at_wins():
+    result = project.perft(GameBoard(rows = 2, cols = 2, limit = 2), 4, workers = 1)
+    assert result["sequences"] == 6
+    result = project.perft(GameBoard(rows = 1, cols = 1, limit = 1), 3, workers = 1)
+    assert result["sequences"] == 1
+    assert result["positions"] == 1
+
+def test_perft_backends_and_workers_agree():
+    gb = GameBoard(rows = 4, cols = 5, limit = 3)
+    assert project.drop_chip(gb, 3)
+    a = project.perft(gb, 5, workers = 1)
+    b = project.perft(gb, 5, workers = 2, backend = "bitboard", mode = "bits")
+    c = project.perft(gb, 5, workers = 1, mode = "lastmove")
+    assert (a["sequences"], a["nodes"], a["positions"]) == (b["sequences"], b["nodes"], b["positions"]) == (c["sequences"], c["nodes"], c["positions"])
+
+def test_run_benchmarks_cases():
+    results = project.run_benchmarks(geometries = [(1, 1, 1), (1, 1, 24), (6, 7, 4)], repeat = 10, backend = "bitboard")
+    assert "play_game 1x1x1" in results and "play_game 6x7x4" in results
+    assert not any("1x1x24" in case for case in results)
+    for phase in ("early", "late"):
+        for name in ("drop_chip", "find_winner[scan]", "find_winner[lastmove]", "find_winner[lines]", "find_winner[bits]", "get_chains", "__str__"):
+            stats = results[f"{name} 6x7x4 {phase}"]
+            assert stats["n"] == 10 and stats["ops"] > 0
+            assert stats["p50_us"] <= stats["p99_us"]
+
+def test_compare_benchmarks():
+    baseline = {"a": {"p50_us": 10.0}, "b": {"p50_us": 10.0}, "c": {"p50_us": 0.5}}
+    results = {"a": {"p50_us": 12.0}, "b": {"p50_us": 20.0}, "c": {"p50_us": 1.0}, "d": {"p50_us": 99.0}}
+    regressions = project.compare_benchmarks(results, baseline)
+    assert list(regressions) == ["b"]
+    assert regressions["b"]["ratio"] == 2.0
+    assert list(project.compare_benchmarks(results, baseline, tolerance = 0.1)) == ["a", "b"]
+
+def test_stats_off_by_default():
+    project.enable_stats(False)
+    gb = GameBoard()
+    assert project.drop_chip(gb, 4)
+    project.find_winner(gb)
+    assert project.stats() == {}
+
+def test_stats_counts_hot_paths():
+    project.enable_stats()
+    try:
+        gb = GameBoard(rows = 4, cols = 4, limit = 3)
+        for c in (1, 1, 2, 2):
+            assert project.drop_chip(gb, c)
+        assert not project.drop_chip(gb, 5)
+        assert project.find_winner(gb, mode = "lastmove") is None
+        gb.render()
+        project.Solver().solve(GameBoard(rows = 4, cols = 5, limit = 4), nodes = 5000)
+        snapshot = project.stats()
+    finally:
+        project.enable_stats(False)
+    assert snapshot["drop_chip.calls"] == 5
+    assert snapshot["drop_chip.rejected"] == 1
+    assert snapshot["find_winner.calls"] == 1
+    assert snapshot["find_winner.cells"] == 2 + 1 + 1 + 1
+    assert snapshot["render.calls"] == 1 and snapshot["render.rows"] == 4
+    assert snapshot["solver.searches"] == 1 and snapshot["solver.nodes"] > 0
+    assert 0 <= snapshot["solver.tt_hit_rate"] <= 1
+    assert 0 <= snapshot["solver.cutoff_rate"] <= 1
+
+def test_fuzz_game_edge_cases():
+    for rows, cols, limit, columns in ((1, 1, 1, [1, 1]), (1, 1, 24, [0, 2, 1]), (2, 3, 0, [1, 1, 1, 2, 3]), (24, 10, 1, [10]), (3, 2, None, [1, 1, 1, 1, 2])):
+        assert project.fuzz_game(rows, cols, limit, columns, engines = ("bitboard", "lastmove", "lines", "make_move")) is None
+
+def test_fuzz_finds_and_shrinks_mismatch(monkeypatch):
+    monkeypatch.setattr(project, "find_chain_bits", lambda gb, mask: False)
+    columns = [3, 3, 1, 2, 1, 2, 9, 1]
+    mismatch = project.fuzz_game(4, 4, 3, columns, engines = ("lastmove", "bitboard"))
+    assert mismatch["engine"] == "bitboard" and mismatch["index"] == 7
+    shrunk = project.shrink_game(4, 4, 3, columns, "bitboard")
+    assert len(shrunk) == 5
+    assert project.fuzz_game(4, 4, 3, shrunk, engines = ("bitboard",)) is not None
+
+def test_fuzz_agrees_across_workers():
+    a = project.fuzz(6, workers = 1, seed = 7, chunk = 2, engines = ("bitboard", "lastmove", "lines", "make_move"))
+    b = project.fuzz(6, workers = 2, seed = 7, chunk = 2, engines = ("bitboard", "lastmove", "lines", "make_move"))
+    assert a["mismatches"] == b["mismatches"] == []
+    assert (a["games"], a["moves"]) == (b["games"], b["moves"])
+
+def test_fuzz_game_batch_engine():
+    pytest.importorskip("numpy")
+    assert project.fuzz_game(1, 1, 1, [1, 1], engines = ("batch",)) is None
+    assert project.fuzz_game(4, 4, 3, [3, 3, 1, 2, 1, 2, 9, 1], engines = ("batch",)) is None
+
+def test_parse_address():
+    assert project.parse_address("127.0.0.1:4444") == ("tcp", "127.0.0.1", 4444)
+    assert project.parse_address(":80") == ("tcp", "127.0.0.1", 80)
+    assert project.parse_address("/tmp/connect.sock") == ("unix", "/tmp/connect.sock", None)
+
+def test_game_server_non_decimal_digits():
+    import asyncio
+    server = project.GameServer(workers = 1)
+    gb = GameBoard()
+    assert asyncio.run(server.play(gb, ["\u00b2"])) == "ERR not a column"
+    assert asyncio.run(server.play(gb, ["4"])).startswith("OK open 4")
+    assert project.parse_address("host:\u00b2") == ("unix", "host:\u00b2", None)
+    server.close()
+
+def test_game_server(tmp_path):
+    import asyncio
+    address = str(tmp_path / "server.sock")
+
+    async def session():
+        server = project.GameServer(ai = "random", workers = 1)
+        ready = asyncio.Event()
+        task = asyncio.create_task(server.serve(address, lambda s: ready.set()))
+        await ready.wait()
+        reader, writer = await asyncio.open_unix_connection(address)
+        replies = []
+        for line in ("1", "NEW 2 2 2", "3", "MOVE 1", "BOARD", "QUIT"):
+            writer.write((line + "\n").encode())
+            replies.append((await reader.readline()).decode().split())
+        writer.close()
+        report = await project.load_test(address, games = 20, clients = 4, rows = 3, cols = 3, limit = 3, seed = 1)
+        task.cancel()
+        return server, replies, report
+
+    server, replies, report = asyncio.run(session())
+    assert replies[0] == ["ERR", "no", "game"]
+    assert replies[1] == ["OK", "2", "2", "2"]
+    assert replies[2] == ["ERR", "illegal", "column"]
+    assert replies[3][:3] == ["OK", "open", "1"] and len(replies[3]) == 4
+    assert replies[4][:2] == ["OK", "open"] and replies[4][2].count(".") == 2
+    assert replies[5] == ["BYE"]
+    assert report["games"] == 20 and report["errors"] == 0
+    assert report["moves"] >= 20 * 3 and report["p50_ms"] <= report["p99_ms"]
+    assert server.games == 21
+
+def test_elo_interval():
+    assert project.elo_interval(0, 0, 0) == (0.0, 0.0, 0.0)
+    elo, low, high = project.elo_interval(30, 10, 10)
+    assert low < elo < high and elo > 0
+    assert project.elo_interval(10, 10, 30) == (-elo, -high, -low)
+    assert project.elo_interval(5, 0, 5)[0] == 0.0
+
+def test_sprt_equal_agents_rarely_stop_early():
+    rng = project.random.Random(5)
+    stopped = 0
+    for _ in range(500):
+        record = [0, 0, 0]
+        for n in range(1, 101):
+            x = rng.random()
+            record[0 if x < 0.45 else 1 if x < 0.55 else 2] += 1
+            if n >= 20 and project.sprt_settled(*record):
+                stopped += 1
+                break
+    assert stopped / 500 < 0.1
+    assert project.sprt_settled(18, 1, 1) and project.sprt_settled(1, 1, 18)
+    assert not project.sprt_settled(10, 0, 10)
+
+def test_make_agent():
+    assert project.make_agent("random") is project.random_policy
+    assert project.make_agent("mcts:10").keywords == {"budget": 10}
+    with pytest.raises(ValueError):
+        project.make_agent("alphazero")
+    with pytest.raises(ValueError):
+        project.make_agent("negamax:lots")
+
+def test_play_match_swaps_seats():
+    scores = project.play_match(("random", "random"), 3, rows = 1, cols = 1, limit = 1)
+    assert scores == [1.0, 0.0]
+    scores = project.play_match(("negamax:500", "random"), 3, rows = 4, cols = 4, limit = 3)
+    assert len(scores) == 2 and all(s in (0.0, 0.5, 1.0) for s in scores)
+
+def test_tournament_stops_early():
+    results = list(project.tournament(["negamax:300", "random", "random"], gauntlet = True, rows = 4, cols = 4, limit = 3, games = 60, workers = 1, seed = 2, every = 5))
+    final = results[-1]
+    assert final["done"] and not any(r["done"] for r in results[:-1])
+    assert set(final["pairs"]) == {"negamax:300 vs random#2", "negamax:300 vs random#3"}
+    for pair in final["pairs"].values():
+        assert 20 <= pair["games"] < 60
+        assert pair["elo_low"] > 0
+    assert list(final["agents"])[0] == "negamax:300"
+    assert results == list(project.tournament(["negamax:300", "random", "random"], gauntlet = True, rows = 4, cols = 4, limit = 3, games = 60, workers = 1, seed = 2, every = 5))
+
+def test_is_draw_matches_open_lines():
+    rng = project.random.Random(23)
+    for _ in range(40):
+        rows, cols = rng.randint(1, 7), rng.randint(1, 7)
+        gb = GameBoard(rows = rows, cols = cols, limit = rng.randint(1, max(rows, cols)), backend = rng.choice(GameBoard.BACKENDS))
+        lines = project.get_lines(gb.rows, gb.cols, gb.limit)[0]
+        while gb.legal_columns():
+            gb.make_move(rng.choice(gb.legal_columns()))
+            open_lines = [ sum(all(gb.get_player(c, r) != q for c, r in line) for line in lines) for q in (GameBoard.PLAYER_B, GameBoard.PLAYER_A) ]
+            assert [gb.count_open_lines(GameBoard.PLAYER_A), gb.count_open_lines(GameBoard.PLAYER_B)] == open_lines
+            assert gb.is_draw() == (open_lines == [0, 0])
+        while gb.moves:
+            gb.unmake_move()
+        assert gb.count_open_lines(GameBoard.PLAYER_A) == gb.count_open_lines(GameBoard.PLAYER_B) == len(lines)
+
+def test_early_draw():
+    gb = GameBoard(rows = 1, cols = 4, limit = 3)
+    assert project.drop_chip(gb, 2) and not gb.is_draw()
+    assert project.drop_chip(gb, 3) and gb.is_draw()
+    assert project.game_result(gb) == "draw"
+    result = project.Solver().solve(gb)
+    assert result["solved"] and result["score"] == 0 and result["distance"] is None
+    assert project.play_game(GameBoard(rows = 1, cols = 4, limit = 3), (lambda gb, rng: 3 if gb.moves else 2,) * 2, project.random.Random(1)) == (0, 2)
+
+def test_ponderer_hint_and_replies():
+    gb = GameBoard(rows = 3, cols = 3, limit = 3)
+    ponderer = project.Ponderer(think = 1.0)
+    ponderer.start(gb)
+    thread = ponderer.thread
+    ponderer.start(gb)
+    assert ponderer.thread is thread
+    assert ponderer.hint() == project.Solver().solve(gb)["c"]
+    thread.join()
+    assert len(ponderer.results) == 3
+    assert project.drop_chip(gb, 1)
+    assert ponderer.reply(gb) == project.Solver().solve(gb)["c"]
+    assert ponderer.thread is None
+
+def test_ponderer_skips_book_positions(tmp_path):
+    path = str(tmp_path / "book.bin")
+    project.build_book(path, rows = 3, cols = 4, limit = 3, depth = 1, think = None, workers = 1)
+    book = project.OpeningBook(path)
+    gb = GameBoard(rows = 3, cols = 4, limit = 3)
+    ponderer = project.Ponderer(think = 1.0, book = book)
+    ponderer.start(gb)
+    ponderer.thread.join()
+    assert ponderer.results == {}
+    assert project.drop_chip(gb, 1)
+    assert ponderer.reply(gb) is None
+    assert project.choose_move(gb, book = book) == book.lookup(gb)["c"]
+    book.close()
+
+def test_book_used_by_server_and_policies(tmp_path):
+    import asyncio
+    path = str(tmp_path / "book.bin")
+    project.build_book(path, rows = 3, cols = 4, limit = 3, depth = 2, think = None, workers = 1)
+    book = project.open_book(path)
+    assert project.open_book(path) is book
+    gb = GameBoard(rows = 3, cols = 4, limit = 3)
+    assert project.drop_chip(gb, 1)
+    policy = project.book_policy(lambda gb, rng: 0, book)
+    assert policy(gb, project.random.Random(1)) == book.lookup(gb)["c"]
+    assert policy(GameBoard(), project.random.Random(1)) == 0
+    server = project.GameServer(ai = "random", workers = 1, book = path)
+    expected = book.lookup(gb)["c"]
+    gb = GameBoard(rows = 3, cols = 4, limit = 3)
+    assert asyncio.run(server.play(gb, ["1"])).split()[3] == str(expected)
+    server.close()
+    assert len(project.play_match(("random", "random"), 1, rows = 3, cols = 4, limit = 3, book = path)) == 2
+    assert project.simulate(4, rows = 3, cols = 4, limit = 3, book = path, workers = 1, seed = 1)["games"] == 4
+
+def test_ponderer_stops():
+    ponderer = project.Ponderer(think = 60.0)
+    ponderer.start(GameBoard(rows = 24, cols = 10, limit = 10))
+    start = project.time.perf_counter()
+    ponderer.stop()
+    assert project.time.perf_counter() - start < 5
+    assert ponderer.hint() is None and ponderer.results == {}
+
+def test_game_database(tmp_path):
+    db = project.GameDatabase(str(tmp_path / "games.db"))
+    lines = ["# games", "4 4 3 3 2 2 1 1", "4, 4, 5", "", "4 9", "x", "2 2 3 3 4 4 5", "6 6 5 5 4 4 3"]
+    assert db.ingest(lines, batch = 2, workers = 1) == {"games": 4, "rejected": 2, "positions": 8 + 4 + 8 + 8}
+    assert len(db) == 4
+    gb = GameBoard()
+    assert db.win_rate(gb) == {"games": 4, "wins": {1: 3, 2: 0}, "draws": 0, "open": 1, "win_rate": {1: 1.0, 2: 0.0}, "draw_rate": 0.0}
+    assert [ (c["c"], c["games"]) for c in db.continuations(gb) ] == [(4, 2), (2, 1), (6, 1)]
+    assert project.drop_chip(gb, 4)
+    assert [ g["moves"] for g in db.find_games(gb) ] == [[4, 4, 3, 3, 2, 2, 1], [4, 4, 5]]
+    assert [ g["result"] for g in db.find_games(gb, limit = 1) ] == ["1"]
+    assert project.drop_chip(gb, 4)
+    assert [ (c["c"], c["games"], c["win_rate"][1]) for c in db.continuations(gb) ] == [(3, 1, 1.0), (5, 1, 0.0)]
+    db.close()
+
+def test_game_database_mirrors(tmp_path):
+    db = project.GameDatabase(str(tmp_path / "games.db"))
+    db.ingest(["2 2 3 3 4 4 5", "6 6 5 5 4 4 3", "2 2"], workers = 2)
+    a, b = GameBoard(), GameBoard()
+    assert project.drop_chip(a, 2) and project.drop_chip(b, 6)
+    assert db.get_key(a)[0] == db.get_key(b)[0] and db.get_key(a)[1] != db.get_key(b)[1]
+    assert db.win_rate(a) == db.win_rate(b)
+    assert db.win_rate(a)["games"] == 3
+    assert [ c["c"] for c in db.continuations(a) ] == [2] and [ c["c"] for c in db.continuations(b) ] == [6]
+    assert db.win_rate(GameBoard(rows = 4))["games"] == 0
+    db.close()
+
+def test_solver_reused_across_sizes():
+    solver = project.Solver()
+    solver.solve(GameBoard(rows = 4, cols = 4, limit = 4), nodes = 20000)
+    result = solver.solve(GameBoard(rows = 2, cols = 2, limit = 2))
+    assert result == project.Solver().solve(GameBoard(rows = 2, cols = 2, limit = 2))
+    assert result["c"] in (1, 2) and result["solved"] and result["score"] > 0
+    solver.solve(GameBoard(rows = 4, cols = 4, limit = 4), nodes = 20000)
+    assert solver.solve(GameBoard(rows = 4, cols = 4, limit = 3))["score"] == project.Solver().solve(GameBoard(rows = 4, cols = 4, limit = 3))["score"]
+
+def test_ingest_and_headless_agree(tmp_path):
+    lines = ["2 3", "1 2 3 4", "1 1 1", "2 2"]
+    results = [ r["result"] for r in project.headless(lines, rows = 1, cols = 4, limit = 3) ]
+    assert results == ["draw", "draw", "illegal", "illegal"]
+    db = project.GameDatabase(str(tmp_path / "games.db"))
+    assert db.ingest(lines, rows = 1, cols = 4, limit = 3, workers = 1)["games"] == 2
+    assert db.win_rate(GameBoard(rows = 1, cols = 4, limit = 3))["draws"] == 2
+    db.close()
+
+def test_game_database_ingest_reads_lazily(tmp_path):
+    import sqlite3
+    stored = []
+    def lines():
+        for i in range(100):
+            if i == 99: stored.append(sqlite3.connect(tmp_path / "games.db").execute("SELECT COUNT(*) FROM games").fetchone()[0])
+            yield "4 4 4 4" if i % 2 else "1 2 3"
+    db = project.GameDatabase(str(tmp_path / "games.db"))
+    assert db.ingest(lines(), batch = 5, workers = 2)["games"] == 100
+    assert stored[0] >= 50
+    db.close()
+
+def test_fuzz_reference_independent_of_heights(monkeypatch):
+    monkeypatch.setattr(GameBoard, "column_height", lambda self, c: 0)
+    mismatch = project.fuzz_game(3, 3, 3, [1, 1], engines = ("drop_chip",))
+    assert mismatch["engine"] == "drop_chip" and mismatch["index"] == 1
+
+def test_moves_setter():
+    gb = GameBoard()
+    gb.moves = [{"c": 1, "r": 1, "player": GameBoard.PLAYER_A}, {"c": 2, "r": 1, "player": GameBoard.PLAYER_B}]
+    assert [ move["player"] for move in gb.moves ] == [GameBoard.PLAYER_A, GameBoard.PLAYER_B]
+    assert gb.get_lastmove() == {"c": 2, "r": 1, "player": GameBoard.PLAYER_B}
+    assert project.find_winner(gb) is None
+
+@pytest.mark.parametrize("backend", ["grid", "bitboard"])
+def test_moves_keep_player_given(backend):
+    gb = GameBoard(backend = backend)
+    for c in (1, 2, 3, 4):
+        assert project.drop_chip(gb, c, p = GameBoard.PLAYER_A)
+    assert [ move["player"] for move in gb.moves ] == [GameBoard.PLAYER_A] * 4
+    for mode in ("scan", "lastmove", "lines", "bits"):
+        assert project.find_winner(gb, mode = mode) == GameBoard.PLAYER_A
+    gb.set_player(1, 1, GameBoard.PLAYER_B)
+    assert gb.moves[0]["player"] == GameBoard.PLAYER_A and gb.get_lastmove()["player"] == GameBoard.PLAYER_B == gb.get_player(1, 1)
+    assert gb.copy().board == gb.board
+    gb = GameBoard(backend = backend)
+    assert project.drop_chip(gb, 1, p = GameBoard.PLAYER_B)
+    gb.unmake_move()
+    assert gb.zobrist == 0 and gb.get_player(1, 1) is None and gb.count_chains(GameBoard.PLAYER_B) == 0